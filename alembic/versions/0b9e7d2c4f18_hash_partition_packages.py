@@ -0,0 +1,143 @@
+"""Hash partition packages by owner (optional)
+
+Revision ID: 0b9e7d2c4f18
+Revises: f1a4c6b8d302
+Create Date: 2026-10-19 16:25:09.318402
+
+Opt-in: the conversion only runs when a partition count is given, e.g.
+``alembic -x packages_partitions=16 upgrade head`` (or the
+``PACKAGES_PARTITIONS`` environment variable). Without it the revision is
+recorded as applied and the table is left as is. To convert later use
+9f2b6d4e8a17, not a downgrade to f1a4c6b8d302: that would pass through the
+downgrade of 8c4e2f7a1d93 and lose ``priced_contents_value_usd``.
+
+The conversion copies the table inside the migration transaction and holds an
+exclusive lock for the whole copy. For large tables use the online backfill
+procedure described in README instead.
+
+"""
+
+import os
+from typing import Sequence, Union
+
+from alembic import context, op
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0b9e7d2c4f18"
+down_revision: Union[str, Sequence[str], None] = "f1a4c6b8d302"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+COLUMNS = (
+    "id, name, weight_kg, type_id, contents_value_usd, contents_currency, "
+    "delivery_cost_rub, owner_session_id"
+)
+
+INDEXES = (
+    "CREATE INDEX ix_packages_owner_session_id ON packages (owner_session_id)",
+    "CREATE INDEX ix_packages_owner_type ON packages (owner_session_id, type_id)",
+    "CREATE INDEX ix_packages_owner_delivery "
+    "ON packages (owner_session_id, delivery_cost_rub)",
+    "CREATE INDEX ix_packages_owner_name_trgm "
+    "ON packages USING gin (owner_session_id, name gin_trgm_ops)",
+)
+
+INDEX_NAMES = (
+    "ix_packages_owner_session_id",
+    "ix_packages_owner_type",
+    "ix_packages_owner_delivery",
+    "ix_packages_owner_name_trgm",
+)
+
+
+def _partition_count() -> int:
+    value = context.get_x_argument(as_dictionary=True).get(
+        "packages_partitions", os.environ.get("PACKAGES_PARTITIONS", "0")
+    )
+    return int(value)
+
+
+def _is_partitioned() -> bool:
+    if context.is_offline_mode():
+        return False
+    relkind = (
+        op.get_bind()
+        .exec_driver_sql(
+            "SELECT relkind::text FROM pg_class WHERE relname = 'packages'"
+        )
+        .scalar()
+    )
+    return relkind == "p"
+
+
+def _rename_existing(suffix: str) -> None:
+    op.execute(f"ALTER TABLE packages RENAME TO packages_{suffix}")
+    op.execute(
+        f"ALTER TABLE packages_{suffix} "
+        f"RENAME CONSTRAINT packages_pkey TO packages_{suffix}_pkey"
+    )
+    op.execute(
+        f"ALTER TABLE packages_{suffix} "
+        f"RENAME CONSTRAINT packages_type_id_fkey TO packages_{suffix}_type_id_fkey"
+    )
+    for name in INDEX_NAMES:
+        op.execute(f"ALTER INDEX {name} RENAME TO {name}_{suffix}")
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    partitions = _partition_count()
+    if partitions < 2 or _is_partitioned():
+        return
+
+    _rename_existing("unpartitioned")
+    op.execute(
+        "CREATE TABLE packages (LIKE packages_unpartitioned INCLUDING DEFAULTS) "
+        "PARTITION BY HASH (owner_session_id)"
+    )
+    # The partition key has to be part of every unique constraint.
+    op.execute(
+        "ALTER TABLE packages ADD CONSTRAINT packages_pkey "
+        "PRIMARY KEY (id, owner_session_id)"
+    )
+    op.execute(
+        "ALTER TABLE packages ADD CONSTRAINT packages_type_id_fkey "
+        "FOREIGN KEY (type_id) REFERENCES package_types (id) ON DELETE RESTRICT"
+    )
+    for remainder in range(partitions):
+        op.execute(
+            f"CREATE TABLE packages_p{remainder} PARTITION OF packages "
+            f"FOR VALUES WITH (MODULUS {partitions}, REMAINDER {remainder})"
+        )
+    # Indexes on the parent are created on every partition.
+    for statement in INDEXES:
+        op.execute(statement)
+
+    op.execute(
+        f"INSERT INTO packages ({COLUMNS}) SELECT {COLUMNS} FROM packages_unpartitioned"
+    )
+    op.execute("DROP TABLE packages_unpartitioned")
+    op.execute("ANALYZE packages")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    if not _is_partitioned():
+        return
+
+    _rename_existing("partitioned")
+    op.execute("CREATE TABLE packages (LIKE packages_partitioned INCLUDING DEFAULTS)")
+    op.execute("ALTER TABLE packages ADD CONSTRAINT packages_pkey PRIMARY KEY (id)")
+    op.execute(
+        "ALTER TABLE packages ADD CONSTRAINT packages_type_id_fkey "
+        "FOREIGN KEY (type_id) REFERENCES package_types (id) ON DELETE RESTRICT"
+    )
+    for statement in INDEXES:
+        op.execute(statement)
+
+    op.execute(
+        f"INSERT INTO packages ({COLUMNS}) SELECT {COLUMNS} FROM packages_partitioned"
+    )
+    op.execute("DROP TABLE packages_partitioned")
+    op.execute("ANALYZE packages")
@@ -0,0 +1,58 @@
+"""Add partial index on unpriced packages
+
+Revision ID: 5d3a9c1e7b42
+Revises: 0b9e7d2c4f18
+Create Date: 2026-10-19 17:02:41.583920
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import context, op
+
+
+# revision identifiers, used by Alembic.
+revision: str = "5d3a9c1e7b42"
+down_revision: Union[str, Sequence[str], None] = "0b9e7d2c4f18"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def _is_partitioned() -> bool:
+    if context.is_offline_mode():
+        return False
+    relkind = (
+        op.get_bind()
+        .exec_driver_sql(
+            "SELECT relkind::text FROM pg_class WHERE relname = 'packages'"
+        )
+        .scalar()
+    )
+    return relkind == "p"
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # CONCURRENTLY is not supported on a partitioned parent (see 0b9e7d2c4f18).
+    concurrently = not _is_partitioned()
+    with op.get_context().autocommit_block():
+        op.create_index(
+            "ix_packages_unpriced",
+            "packages",
+            ["id"],
+            unique=False,
+            postgresql_where=sa.text("delivery_cost_rub IS NULL"),
+            postgresql_concurrently=concurrently,
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    concurrently = not _is_partitioned()
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            "ix_packages_unpriced",
+            table_name="packages",
+            postgresql_concurrently=concurrently,
+        )
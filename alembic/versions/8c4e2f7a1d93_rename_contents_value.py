@@ -0,0 +1,48 @@
+"""Rename contents_value_usd and store the priced USD equivalent
+
+Revision ID: 8c4e2f7a1d93
+Revises: 5d3a9c1e7b42
+Create Date: 2026-10-19 19:12:05.417288
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = "8c4e2f7a1d93"
+down_revision: Union[str, Sequence[str], None] = "5d3a9c1e7b42"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # The amount is denominated in contents_currency since e5d8f3a6c210.
+    # Renames are catalog-only (and cascade to partitions of a partitioned table).
+    op.alter_column("packages", "contents_value_usd", new_column_name="contents_value")
+    op.alter_column(
+        "packages_archive", "contents_value_usd", new_column_name="contents_value"
+    )
+    # USD equivalent at the rate used for pricing, so a stats rebuild reproduces
+    # the incrementally maintained totals. NULL for parcels priced before this.
+    op.add_column(
+        "packages",
+        sa.Column(
+            "priced_contents_value_usd",
+            sa.Numeric(precision=12, scale=2),
+            nullable=True,
+        ),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column("packages", "priced_contents_value_usd")
+    op.alter_column(
+        "packages_archive", "contents_value", new_column_name="contents_value_usd"
+    )
+    op.alter_column("packages", "contents_value", new_column_name="contents_value_usd")
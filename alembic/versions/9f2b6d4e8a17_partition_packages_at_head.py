@@ -0,0 +1,138 @@
+"""Hash partition packages by owner on the current schema (optional)
+
+Revision ID: 9f2b6d4e8a17
+Revises: b7d1e3f5a920
+Create Date: 2026-10-19 20:41:12.906531
+
+Same opt-in conversion as 0b9e7d2c4f18, for databases that are already past
+it with an unpartitioned table. Converting through 0b9e7d2c4f18 would need a
+downgrade past 8c4e2f7a1d93, which drops ``priced_contents_value_usd``; this
+revision only has to be downgraded itself, so it has to stay the head:
+
+``alembic downgrade b7d1e3f5a920`` then
+``alembic -x packages_partitions=16 upgrade head`` (or ``PACKAGES_PARTITIONS``).
+
+Without a partition count, or if ``packages`` is already partitioned, the
+upgrade does nothing. The downgrade turns a partitioned table back into a plain
+one, so downgrading to b7d1e3f5a920 and upgrading without the option reverts
+the conversion. Like 0b9e7d2c4f18 the copy holds an exclusive lock; for large
+tables use the online procedure from README.
+
+"""
+
+import os
+from typing import Sequence, Union
+
+from alembic import context, op
+
+
+# revision identifiers, used by Alembic.
+revision: str = "9f2b6d4e8a17"
+down_revision: Union[str, Sequence[str], None] = "b7d1e3f5a920"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+COLUMNS = (
+    "id, name, weight_kg, type_id, contents_value, contents_currency, "
+    "delivery_cost_rub, priced_contents_value_usd, owner_session_id"
+)
+
+INDEXES = (
+    "CREATE INDEX ix_packages_owner_session_id ON packages (owner_session_id)",
+    "CREATE INDEX ix_packages_owner_type ON packages (owner_session_id, type_id)",
+    "CREATE INDEX ix_packages_owner_delivery "
+    "ON packages (owner_session_id, delivery_cost_rub)",
+    "CREATE INDEX ix_packages_owner_name_trgm "
+    "ON packages USING gin (owner_session_id, name gin_trgm_ops)",
+    "CREATE INDEX ix_packages_unpriced ON packages (id) "
+    "WHERE delivery_cost_rub IS NULL",
+)
+
+INDEX_NAMES = (
+    "ix_packages_owner_session_id",
+    "ix_packages_owner_type",
+    "ix_packages_owner_delivery",
+    "ix_packages_owner_name_trgm",
+    "ix_packages_unpriced",
+)
+
+
+def _partition_count() -> int:
+    value = context.get_x_argument(as_dictionary=True).get(
+        "packages_partitions", os.environ.get("PACKAGES_PARTITIONS", "0")
+    )
+    return int(value)
+
+
+def _is_partitioned() -> bool:
+    if context.is_offline_mode():
+        return False
+    relkind = (
+        op.get_bind()
+        .exec_driver_sql(
+            "SELECT relkind::text FROM pg_class WHERE relname = 'packages'"
+        )
+        .scalar()
+    )
+    return relkind == "p"
+
+
+def _rename_existing(suffix: str) -> None:
+    op.execute(f"ALTER TABLE packages RENAME TO packages_{suffix}")
+    op.execute(
+        f"ALTER TABLE packages_{suffix} "
+        f"RENAME CONSTRAINT packages_pkey TO packages_{suffix}_pkey"
+    )
+    op.execute(
+        f"ALTER TABLE packages_{suffix} "
+        f"RENAME CONSTRAINT packages_type_id_fkey TO packages_{suffix}_type_id_fkey"
+    )
+    for name in INDEX_NAMES:
+        op.execute(f"ALTER INDEX {name} RENAME TO {name}_{suffix}")
+
+
+def _create_table(partitions: int, source: str) -> None:
+    partition_by = " PARTITION BY HASH (owner_session_id)" if partitions else ""
+    op.execute(
+        f"CREATE TABLE packages (LIKE {source} INCLUDING DEFAULTS){partition_by}"
+    )
+    # The partition key has to be part of every unique constraint.
+    primary_key = "id, owner_session_id" if partitions else "id"
+    op.execute(
+        f"ALTER TABLE packages ADD CONSTRAINT packages_pkey PRIMARY KEY ({primary_key})"
+    )
+    op.execute(
+        "ALTER TABLE packages ADD CONSTRAINT packages_type_id_fkey "
+        "FOREIGN KEY (type_id) REFERENCES package_types (id) ON DELETE RESTRICT"
+    )
+    for remainder in range(partitions):
+        op.execute(
+            f"CREATE TABLE packages_p{remainder} PARTITION OF packages "
+            f"FOR VALUES WITH (MODULUS {partitions}, REMAINDER {remainder})"
+        )
+    # Indexes on a partitioned parent are created on every partition.
+    for statement in INDEXES:
+        op.execute(statement)
+
+    op.execute(f"INSERT INTO packages ({COLUMNS}) SELECT {COLUMNS} FROM {source}")
+    op.execute(f"DROP TABLE {source}")
+    op.execute("ANALYZE packages")
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    partitions = _partition_count()
+    if partitions < 2 or _is_partitioned():
+        return
+
+    _rename_existing("unpartitioned")
+    _create_table(partitions, "packages_unpartitioned")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    if not _is_partitioned():
+        return
+
+    _rename_existing("partitioned")
+    _create_table(0, "packages_partitioned")
@@ -0,0 +1,61 @@
+"""Add package stats rollup
+
+Revision ID: a3f1c9d27b6e
+Revises: 28caf8fd5639
+Create Date: 2026-10-19 12:04:11.482913
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "a3f1c9d27b6e"
+down_revision: Union[str, Sequence[str], None] = "28caf8fd5639"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        "package_stats",
+        sa.Column("id", sa.UUID(), nullable=False),
+        sa.Column("owner_session_id", sa.String(length=128), nullable=False),
+        sa.Column("type_id", sa.UUID(), nullable=True),
+        sa.Column("package_count", sa.Integer(), server_default="0", nullable=False),
+        sa.Column(
+            "total_weight_kg",
+            sa.Numeric(precision=16, scale=3),
+            server_default="0",
+            nullable=False,
+        ),
+        sa.Column(
+            "total_contents_value_usd",
+            sa.Numeric(precision=18, scale=2),
+            server_default="0",
+            nullable=False,
+        ),
+        sa.Column("calculated_count", sa.Integer(), server_default="0", nullable=False),
+        sa.Column(
+            "total_delivery_cost_rub",
+            sa.Numeric(precision=20, scale=2),
+            server_default="0",
+            nullable=False,
+        ),
+        sa.PrimaryKeyConstraint("id"),
+        sa.UniqueConstraint(
+            "owner_session_id",
+            "type_id",
+            name="uq_package_stats_owner_type",
+            postgresql_nulls_not_distinct=True,
+        ),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table("package_stats")
@@ -0,0 +1,37 @@
+"""Keep the priced USD equivalent in packages_archive
+
+Revision ID: b7d1e3f5a920
+Revises: 8c4e2f7a1d93
+Create Date: 2026-10-19 20:17:38.152704
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = "b7d1e3f5a920"
+down_revision: Union[str, Sequence[str], None] = "8c4e2f7a1d93"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # NULL for rows archived before this revision.
+    op.add_column(
+        "packages_archive",
+        sa.Column(
+            "priced_contents_value_usd",
+            sa.Numeric(precision=12, scale=2),
+            nullable=True,
+        ),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column("packages_archive", "priced_contents_value_usd")
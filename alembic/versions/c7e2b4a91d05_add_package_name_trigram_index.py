@@ -0,0 +1,46 @@
+"""Add package name trigram index
+
+Revision ID: c7e2b4a91d05
+Revises: a3f1c9d27b6e
+Create Date: 2026-10-19 13:21:47.906144
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = "c7e2b4a91d05"
+down_revision: Union[str, Sequence[str], None] = "a3f1c9d27b6e"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # pg_trgm provides gin_trgm_ops for ILIKE '%q%', btree_gin lets the varchar
+    # owner column live in the same GIN index so lookups stay owner-scoped.
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    op.execute("CREATE EXTENSION IF NOT EXISTS btree_gin")
+    with op.get_context().autocommit_block():
+        op.create_index(
+            "ix_packages_owner_name_trgm",
+            "packages",
+            ["owner_session_id", "name"],
+            unique=False,
+            postgresql_using="gin",
+            postgresql_ops={"name": "gin_trgm_ops"},
+            postgresql_concurrently=True,
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            "ix_packages_owner_name_trgm",
+            table_name="packages",
+            postgresql_concurrently=True,
+        )
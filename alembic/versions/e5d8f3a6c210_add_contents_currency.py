@@ -0,0 +1,37 @@
+"""Add contents currency
+
+Revision ID: e5d8f3a6c210
+Revises: c7e2b4a91d05
+Create Date: 2026-10-19 14:02:33.175820
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "e5d8f3a6c210"
+down_revision: Union[str, Sequence[str], None] = "c7e2b4a91d05"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column(
+        "packages",
+        sa.Column(
+            "contents_currency",
+            sa.String(length=3),
+            server_default="USD",
+            nullable=False,
+        ),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column("packages", "contents_currency")
@@ -0,0 +1,59 @@
+"""Add packages archive
+
+Revision ID: f1a4c6b8d302
+Revises: e5d8f3a6c210
+Create Date: 2026-10-19 15:10:52.640318
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "f1a4c6b8d302"
+down_revision: Union[str, Sequence[str], None] = "e5d8f3a6c210"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        "packages_archive",
+        sa.Column("id", sa.UUID(), nullable=False),
+        sa.Column("name", sa.String(length=255), nullable=False),
+        sa.Column("weight_kg", sa.Numeric(precision=10, scale=3), nullable=False),
+        sa.Column("type_id", sa.UUID(), nullable=True),
+        sa.Column(
+            "contents_value_usd", sa.Numeric(precision=12, scale=2), nullable=False
+        ),
+        sa.Column("contents_currency", sa.String(length=3), nullable=False),
+        sa.Column(
+            "delivery_cost_rub", sa.Numeric(precision=14, scale=2), nullable=True
+        ),
+        sa.Column("owner_session_id", sa.String(length=128), nullable=False),
+        sa.Column(
+            "archived_at",
+            sa.DateTime(timezone=True),
+            server_default=sa.text("now()"),
+            nullable=False,
+        ),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index(
+        op.f("ix_packages_archive_owner_session_id"),
+        "packages_archive",
+        ["owner_session_id"],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(
+        op.f("ix_packages_archive_owner_session_id"), table_name="packages_archive"
+    )
+    op.drop_table("packages_archive")
@@ -0,0 +1,89 @@
+"""Compare the ``package_stats`` rollup read with the raw ``GROUP BY`` over ``packages``.
+
+Seeds a throwaway session with N packages, rebuilds its rollup and times both
+queries. Requires a migrated database (``DATABASE_URL`` from settings).
+
+Usage: ``python -m benchmarks.package_stats_benchmark --packages 200000 --runs 50``
+"""
+
+import argparse
+import asyncio
+import statistics
+import time
+import uuid
+
+from sqlalchemy import delete, text
+
+from src.data.db.session import async_session, engine
+from src.data.models.models import Package
+from src.data.repositories.db_crud import UserDAL
+
+SEED_QUERY = text(
+    """
+    INSERT INTO packages (
+        id, name, weight_kg, type_id, contents_value, delivery_cost_rub,
+        owner_session_id
+    )
+    SELECT
+        gen_random_uuid(),
+        'bench-' || n,
+        round((random() * 50 + 0.1)::numeric, 3),
+        (SELECT id FROM package_types ORDER BY random() LIMIT 1),
+        round((random() * 5000 + 1)::numeric, 2),
+        CASE WHEN random() < 0.7
+            THEN round((random() * 20000)::numeric, 2) END,
+        :owner
+    FROM generate_series(1, :count) AS n
+    """
+)
+
+
+async def _timed(call, runs: int) -> list[float]:
+    timings = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        await call()
+        timings.append((time.perf_counter() - started) * 1000)
+    return timings
+
+
+def _report(label: str, timings: list[float]) -> None:
+    timings = sorted(timings)
+    p95 = timings[max(int(len(timings) * 0.95) - 1, 0)]
+    print(
+        f"{label:<10} median={statistics.median(timings):8.2f} ms  "
+        f"p95={p95:8.2f} ms  max={timings[-1]:8.2f} ms"
+    )
+
+
+async def main(packages: int, runs: int) -> None:
+    owner = f"bench-{uuid.uuid4()}"
+    async with async_session() as session_db:
+        user_dal = UserDAL(session_db)
+        async with session_db.begin():
+            await session_db.execute(SEED_QUERY, {"owner": owner, "count": packages})
+            await user_dal.rebuild_package_stats(owner)
+
+        try:
+            rollup = await _timed(lambda: user_dal.get_package_stats(owner), runs)
+            raw = await _timed(lambda: user_dal.get_package_stats_raw(owner), runs)
+            print(f"session with {packages} packages, {runs} runs each")
+            _report("rollup", rollup)
+            _report("group by", raw)
+        finally:
+            await session_db.rollback()
+            async with session_db.begin():
+                await session_db.execute(
+                    delete(Package).where(Package.owner_session_id == owner)
+                )
+                await user_dal.rebuild_package_stats(owner)
+
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--packages", type=int, default=100_000)
+    parser.add_argument("--runs", type=int, default=30)
+    args = parser.parse_args()
+    asyncio.run(main(args.packages, args.runs))
@@ -0,0 +1,219 @@
+"""Query latency of ``packages`` as a plain heap vs hash partitioned by owner.
+
+Builds both layouts side by side in a scratch schema with the same columns and
+owner-scoped indexes as ``packages``, loads identical data into each and times,
+for random owners, the queries ``UserDAL.get_user_packages_with_pagination``
+issues, the cost sweep's per-row ``UPDATE`` and the ``id = ANY(...)`` lookup -
+the last two with and without the ``owner_session_id`` predicate that lets the
+partitioned table prune to one partition. Loading 10M rows takes a while and
+needs a few GB of disk.
+
+Usage:
+``python -m benchmarks.partitioning_benchmark --rows 10000000 --owners 200000 --partitions 16``
+"""
+
+import argparse
+import asyncio
+import random
+import statistics
+import time
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncConnection
+
+from src.data.db.session import engine
+
+SCHEMA = "bench_partitioning"
+LOAD_CHUNK_ROWS = 1_000_000
+
+TABLE_COLUMNS = """
+    id uuid NOT NULL,
+    name varchar(255) NOT NULL,
+    weight_kg numeric(10, 3) NOT NULL,
+    type_id uuid,
+    contents_value numeric(12, 2) NOT NULL,
+    contents_currency varchar(3) NOT NULL DEFAULT 'USD',
+    delivery_cost_rub numeric(14, 2),
+    owner_session_id varchar(128) NOT NULL
+"""
+
+LIST_QUERY = """
+    SELECT * FROM {table}
+    WHERE owner_session_id = :owner
+    ORDER BY weight_kg DESC
+    LIMIT 10 OFFSET 0
+"""
+
+COUNT_QUERY = """
+    SELECT count(*) FROM {table}
+    WHERE owner_session_id = :owner AND delivery_cost_rub IS NULL
+"""
+
+UPDATE_BY_ID_QUERY = """
+    UPDATE {table} SET delivery_cost_rub = delivery_cost_rub
+    WHERE id = :id
+"""
+
+UPDATE_BY_ID_OWNER_QUERY = """
+    UPDATE {table} SET delivery_cost_rub = delivery_cost_rub
+    WHERE id = :id AND owner_session_id = :owner
+"""
+
+LOOKUP_QUERY = """
+    SELECT * FROM {table} WHERE id = ANY(CAST(:ids AS uuid[]))
+"""
+
+LOOKUP_OWNER_QUERY = """
+    SELECT * FROM {table}
+    WHERE id = ANY(CAST(:ids AS uuid[])) AND owner_session_id = :owner
+"""
+
+SAMPLE_QUERY = f"""
+    SELECT owner_session_id, array_agg(id)
+    FROM {SCHEMA}.plain
+    WHERE owner_session_id = ANY(CAST(:owners AS varchar[]))
+    GROUP BY owner_session_id
+"""
+
+
+async def _create_tables(conn: AsyncConnection, partitions: int) -> None:
+    await conn.execute(text(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE"))
+    await conn.execute(text(f"CREATE SCHEMA {SCHEMA}"))
+
+    await conn.execute(
+        text(f"CREATE TABLE {SCHEMA}.plain ({TABLE_COLUMNS}, PRIMARY KEY (id))")
+    )
+    await conn.execute(
+        text(
+            f"CREATE TABLE {SCHEMA}.partitioned ({TABLE_COLUMNS}, "
+            f"PRIMARY KEY (id, owner_session_id)) "
+            f"PARTITION BY HASH (owner_session_id)"
+        )
+    )
+    for remainder in range(partitions):
+        await conn.execute(
+            text(
+                f"CREATE TABLE {SCHEMA}.partitioned_p{remainder} "
+                f"PARTITION OF {SCHEMA}.partitioned "
+                f"FOR VALUES WITH (MODULUS {partitions}, REMAINDER {remainder})"
+            )
+        )
+
+
+async def _create_indexes(conn: AsyncConnection) -> None:
+    for table in ("plain", "partitioned"):
+        for columns in (
+            "owner_session_id",
+            "owner_session_id, type_id",
+            "owner_session_id, delivery_cost_rub",
+        ):
+            await conn.execute(text(f"CREATE INDEX ON {SCHEMA}.{table} ({columns})"))
+        await conn.execute(text(f"ANALYZE {SCHEMA}.{table}"))
+
+
+async def _load(conn: AsyncConnection, rows: int, owners: int) -> None:
+    for start in range(0, rows, LOAD_CHUNK_ROWS):
+        count = min(LOAD_CHUNK_ROWS, rows - start)
+        await conn.execute(
+            text(
+                f"""
+                INSERT INTO {SCHEMA}.plain (
+                    id, name, weight_kg, contents_value, delivery_cost_rub,
+                    owner_session_id
+                )
+                SELECT
+                    gen_random_uuid(),
+                    'bench-' || n,
+                    round((random() * 50 + 0.1)::numeric, 3),
+                    round((random() * 5000 + 1)::numeric, 2),
+                    CASE WHEN random() < 0.7
+                        THEN round((random() * 20000)::numeric, 2) END,
+                    'owner-' || (random() * :owners)::int
+                FROM generate_series(1, :count) AS n
+                """
+            ),
+            {"owners": owners, "count": count},
+        )
+        print(f"loaded {start + count} rows")
+    await conn.execute(
+        text(f"INSERT INTO {SCHEMA}.partitioned SELECT * FROM {SCHEMA}.plain")
+    )
+
+
+async def _time_query(
+    conn: AsyncConnection, query: str, params: list[dict]
+) -> list[float]:
+    statement = text(query)
+    timings = []
+    for item in params:
+        started = time.perf_counter()
+        await conn.execute(statement, item)
+        timings.append((time.perf_counter() - started) * 1000)
+    return timings
+
+
+def _report(label: str, timings: list[float]) -> None:
+    timings = sorted(timings)
+    p95 = timings[max(int(len(timings) * 0.95) - 1, 0)]
+    print(f"{label:<30} median={statistics.median(timings):7.3f} ms  p95={p95:7.3f} ms")
+
+
+async def main(
+    rows: int, owners: int, partitions: int, samples: int, keep: bool
+) -> None:
+    async with engine.connect() as conn:
+        conn = await conn.execution_options(isolation_level="AUTOCOMMIT")
+        await _create_tables(conn, partitions)
+        await _load(conn, rows, owners)
+        await _create_indexes(conn)
+
+        sample_owners = [f"owner-{random.randint(0, owners)}" for _ in range(samples)]
+        result = await conn.execute(text(SAMPLE_QUERY), {"owners": sample_owners})
+        owner_ids = {owner: [str(item) for item in ids] for owner, ids in result}
+        by_owner = [{"owner": owner} for owner in sample_owners]
+        by_id = [
+            {"owner": owner, "id": random.choice(ids)}
+            for owner, ids in owner_ids.items()
+        ]
+        by_ids = [{"owner": owner, "ids": ids[:20]} for owner, ids in owner_ids.items()]
+        queries = {
+            "list": (LIST_QUERY, by_owner),
+            "count": (COUNT_QUERY, by_owner),
+            "update id": (UPDATE_BY_ID_QUERY, by_id),
+            "update id+owner": (UPDATE_BY_ID_OWNER_QUERY, by_id),
+            "lookup ids": (LOOKUP_QUERY, by_ids),
+            "lookup ids+owner": (LOOKUP_OWNER_QUERY, by_ids),
+        }
+        # Warm both layouts equally before measuring.
+        for table in ("plain", "partitioned"):
+            await _time_query(
+                conn, LIST_QUERY.format(table=f"{SCHEMA}.{table}"), by_owner
+            )
+
+        print(f"{rows} rows, {owners} owners, {partitions} partitions")
+        for label, (query, params) in queries.items():
+            for table in ("plain", "partitioned"):
+                _report(
+                    f"{table} {label}",
+                    await _time_query(
+                        conn, query.format(table=f"{SCHEMA}.{table}"), params
+                    ),
+                )
+
+        if not keep:
+            await conn.execute(text(f"DROP SCHEMA {SCHEMA} CASCADE"))
+
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=10_000_000)
+    parser.add_argument("--owners", type=int, default=200_000)
+    parser.add_argument("--partitions", type=int, default=16)
+    parser.add_argument("--samples", type=int, default=500)
+    parser.add_argument(
+        "--keep", action="store_true", help="keep the scratch schema for reruns"
+    )
+    args = parser.parse_args()
+    asyncio.run(main(args.rows, args.owners, args.partitions, args.samples, args.keep))
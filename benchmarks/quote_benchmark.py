@@ -0,0 +1,63 @@
+"""Throughput of ``POST /api/quote`` pricing inside one process.
+
+Measures request validation, pricing and response serialization with a warm
+in-process rate table (the steady state of a running server), without HTTP.
+Target: at least 5000 quotes per second per process.
+
+Usage: ``python -m benchmarks.quote_benchmark --quotes 200000``
+"""
+
+import argparse
+import asyncio
+import random
+import time
+
+from src.schemas.package_schemas import QuoteRequest
+from src.services.quote_service import _quote_delivery
+from src.utils.currency_utils import CurrencyService
+
+TARGET_QUOTES_PER_SECOND = 5000
+RATES = {"RUB": 1.0, "USD": 90.0, "EUR": 98.5, "CNY": 12.4, "KZT": 0.18}
+
+
+def _payload(batch_size: int) -> dict:
+    return {
+        "items": [
+            {
+                "weight_kg": f"{random.uniform(0.1, 50):.3f}",
+                "contents_value": f"{random.uniform(1, 5000):.2f}",
+                "contents_currency": random.choice(list(RATES)),
+            }
+            for _ in range(batch_size)
+        ]
+    }
+
+
+async def main(quotes: int) -> None:
+    currency_service = CurrencyService(None)
+    currency_service.local_ttl = float("inf")
+    currency_service._set_local_rates(RATES)
+
+    for batch_size in (1, 10, 100, 1000):
+        payload = _payload(batch_size)
+        requests = max(quotes // batch_size, 1)
+
+        started = time.perf_counter()
+        for _ in range(requests):
+            response = await _quote_delivery(QuoteRequest.model_validate(payload), None)
+            response.model_dump_json()
+        elapsed = time.perf_counter() - started
+
+        rate = requests * batch_size / elapsed
+        status = "ok" if rate >= TARGET_QUOTES_PER_SECOND else "BELOW TARGET"
+        print(
+            f"batch={batch_size:<5} {rate:10.0f} quotes/s  "
+            f"{elapsed / requests * 1000:7.3f} ms/request  [{status}]"
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--quotes", type=int, default=100_000)
+    args = parser.parse_args()
+    asyncio.run(main(args.quotes))
@@ -0,0 +1,160 @@
+"""Startup, first-request latency and throughput of ``src.server`` per worker count.
+
+For every worker count the launcher is started as a subprocess against the
+configured Postgres/Redis, once with the lifespan warm-up and once with
+``WARMUP_ENABLED=False``. Each run reports:
+
+- ready: time until ``--ready-path`` first answers 200 (imports, lifespan and,
+  with warm-up, the warm-up itself);
+- first requests: latency of the first ``--first-requests`` calls of ``--path``,
+  each on a new connection so they spread over the workers;
+- throughput of ``--path`` under ``--clients`` keep-alive connections spread
+  over ``--load-procs`` processes for ``--seconds``.
+
+Run the load generator on a different machine (or give it spare cores) when
+measuring more than a couple of workers.
+
+Usage:
+``python -m benchmarks.server_benchmark --workers 1 2 4 --path /api/package-types``
+"""
+
+import argparse
+import asyncio
+import multiprocessing
+import os
+import subprocess
+import sys
+import time
+
+import httpx
+
+STARTUP_TIMEOUT_SECONDS = 60
+
+
+def _import_time() -> float:
+    code = (
+        "import time; started = time.perf_counter(); import src.main; "
+        "print(time.perf_counter() - started)"
+    )
+    output = subprocess.run(
+        [sys.executable, "-c", code], capture_output=True, text=True, check=True
+    )
+    return float(output.stdout.strip().splitlines()[-1])
+
+
+def _wait_ready(url: str, started: float) -> float:
+    deadline = started + STARTUP_TIMEOUT_SECONDS
+    with httpx.Client(timeout=1.0) as client:
+        while time.perf_counter() < deadline:
+            try:
+                if client.get(url).status_code == 200:
+                    return time.perf_counter() - started
+            except httpx.TransportError:
+                pass
+            time.sleep(0.01)
+    raise RuntimeError(f"{url} did not answer within {STARTUP_TIMEOUT_SECONDS}s")
+
+
+def _first_requests(url: str, count: int) -> list[float]:
+    timings = []
+    for _ in range(count):
+        with httpx.Client(timeout=30.0) as client:
+            started = time.perf_counter()
+            response = client.get(url)
+            timings.append(time.perf_counter() - started)
+        response.raise_for_status()
+    return timings
+
+
+async def _load(url: str, clients: int, seconds: float) -> tuple[int, int]:
+    deadline = time.perf_counter() + seconds
+    ok = failed = 0
+
+    async def client_loop(client: httpx.AsyncClient) -> None:
+        nonlocal ok, failed
+        while time.perf_counter() < deadline:
+            try:
+                response = await client.get(url)
+            except httpx.TransportError:
+                failed += 1
+                continue
+            if response.status_code == 200:
+                ok += 1
+            else:
+                failed += 1
+
+    limits = httpx.Limits(max_connections=clients, max_keepalive_connections=clients)
+    async with httpx.AsyncClient(limits=limits, timeout=10.0) as client:
+        await asyncio.gather(*(client_loop(client) for _ in range(clients)))
+    return ok, failed
+
+
+def _load_process(args: tuple[str, int, float]) -> tuple[int, int]:
+    return asyncio.run(_load(*args))
+
+
+def _run(workers: int, warm_up: bool, args: argparse.Namespace) -> None:
+    base_url = f"http://127.0.0.1:{args.port}"
+    url = base_url + args.path
+    env = {
+        **os.environ,
+        "WEB_WORKERS": str(workers),
+        "APP_HOST": "127.0.0.1",
+        "APP_PORT": str(args.port),
+        "LOG_LEVEL": "WARNING",
+        "WARMUP_ENABLED": str(warm_up),
+    }
+    started = time.perf_counter()
+    server = subprocess.Popen([sys.executable, "-m", "src.server"], env=env)
+    try:
+        ready = _wait_ready(base_url + args.ready_path, started)
+        # Let the remaining workers finish starting before measuring.
+        time.sleep(args.settle)
+        first = _first_requests(url, args.first_requests or 2 * workers)
+
+        per_process = max(1, args.clients // args.load_procs)
+        with multiprocessing.Pool(args.load_procs) as pool:
+            results = pool.map(
+                _load_process,
+                [(url, per_process, args.seconds)] * args.load_procs,
+            )
+        ok = sum(item[0] for item in results)
+        failed = sum(item[1] for item in results)
+        print(
+            f"workers={workers:<3} warm-up={'on' if warm_up else 'off':<4}"
+            f"ready {ready * 1000:8.1f} ms  "
+            f"first request {first[0] * 1000:7.1f} ms  "
+            f"first {len(first)} max {max(first) * 1000:7.1f} ms  "
+            f"{ok / args.seconds:8.1f} req/s  ({failed} failed)"
+        )
+    finally:
+        server.terminate()
+        server.wait(timeout=30)
+
+
+def main(args: argparse.Namespace) -> None:
+    print(f"import src.main: {_import_time() * 1000:.1f} ms")
+    for workers in args.workers:
+        for warm_up in (True, False):
+            _run(workers, warm_up, args)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "--workers", type=int, nargs="+", default=[1, 2, os.cpu_count() or 1]
+    )
+    parser.add_argument("--path", default="/api/package-types")
+    parser.add_argument("--ready-path", default="/ping")
+    parser.add_argument(
+        "--first-requests",
+        type=int,
+        default=0,
+        help="cold requests to time after startup (default: 2 per worker)",
+    )
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--clients", type=int, default=64)
+    parser.add_argument("--load-procs", type=int, default=2)
+    parser.add_argument("--seconds", type=float, default=10.0)
+    parser.add_argument("--settle", type=float, default=2.0)
+    main(parser.parse_args())
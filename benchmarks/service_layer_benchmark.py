@@ -0,0 +1,82 @@
+"""Service-layer throughput on the in-memory repository, no Postgres needed.
+
+Creates ``--packages`` packages through ``_create_package`` for ``--owners``
+sessions, then times ``_get_user_packages_with_filters`` list pages (plain,
+type filter, calculated-cost filter and name search) for random sessions.
+
+Usage:
+``REPOSITORY_BACKEND=memory python -m benchmarks.service_layer_benchmark --packages 200000``
+"""
+
+import argparse
+import asyncio
+import random
+import time
+from decimal import Decimal
+
+from src.data.repositories.memory import MemoryPackageRepository
+from src.schemas.package_schemas import PackageCreate
+from src.schemas.schemas import PackageFilter, PaginationParams
+from src.services.package_service import (
+    _create_package,
+    _get_user_packages_with_filters,
+)
+from src.settings import settings
+
+
+async def _timed(label: str, calls: int, make_call) -> None:
+    started = time.perf_counter()
+    for _ in range(calls):
+        await make_call()
+    elapsed = time.perf_counter() - started
+    print(f"{label:<22} {calls / elapsed:10.1f} calls/s")
+
+
+async def main(packages: int, owners: int, calls: int) -> None:
+    if settings.REPOSITORY_BACKEND != "memory":
+        raise SystemExit("Run with REPOSITORY_BACKEND=memory")
+
+    repository = MemoryPackageRepository()
+    type_ids = [item.id for item in await repository.get_all_types_packages()]
+    sessions = [f"bench-session-{index}" for index in range(owners)]
+
+    started = time.perf_counter()
+    for index in range(packages):
+        body = PackageCreate(
+            name=f"parcel {index}",
+            weight_kg=Decimal(f"{random.uniform(0.1, 50):.3f}"),
+            type_id=random.choice(type_ids),
+            contents_value=Decimal(f"{random.uniform(1, 5000):.2f}"),
+        )
+        package = await _create_package(body, random.choice(sessions), None)
+        if random.random() < 0.7:
+            repository.set_delivery_cost(
+                package.owner_session_id, package.id, Decimal("100.00")
+            )
+    elapsed = time.perf_counter() - started
+    print(f"{'create':<22} {packages / elapsed:10.1f} calls/s")
+
+    pagination = PaginationParams(page=3, page_size=20)
+    filters = {
+        "list": PackageFilter(),
+        "list by type": PackageFilter(type_id=type_ids[0]),
+        "list calculated": PackageFilter(has_calculated_cost=True),
+        "list name search": PackageFilter(q="parcel 1"),
+    }
+    for label, package_filter in filters.items():
+        await _timed(
+            label,
+            calls,
+            lambda package_filter=package_filter: _get_user_packages_with_filters(
+                package_filter, pagination, random.choice(sessions), None
+            ),
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--packages", type=int, default=200_000)
+    parser.add_argument("--owners", type=int, default=100)
+    parser.add_argument("--calls", type=int, default=5_000)
+    args = parser.parse_args()
+    asyncio.run(main(args.packages, args.owners, args.calls))
@@ -1,5 +1,8 @@
 from uuid import UUID
-from fastapi import Depends
+from fastapi import Depends, Header, Query, Request
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse, StreamingResponse
+from pydantic import ValidationError
 from sqlalchemy.ext.asyncio import AsyncSession
 from fastapi import HTTPException, APIRouter
 from src.schemas.package_schemas import (
@@ -7,18 +10,39 @@ from src.schemas.package_schemas import (
     PackageCreateResponse,
     PackageResponse,
     PackageListResponse,
+    PackageLookupRequest,
+    PackageLookupResponse,
+    PackageSuggestResponse,
+    QuoteRequest,
+    QuoteResponse,
 )
 from src.data.db.session import get_db
 from src.dependencies.dependencies import get_session_id
 from src.services.package_service import (
+    _check_contents_value,
     _create_package,
+    _export_user_packages,
     _get_package_by_id,
     _get_user_packages_with_filters,
+    _lookup_packages_by_ids,
+    _suggest_packages,
 )
 from src.services.package_type_service import _get_list_types_packages
+from src.services.package_stats_service import _get_package_stats
+from src.services.quote_service import _quote_delivery
 from src.schemas.package_type import PackageTypeList, PackageTypeResponse
-from src.schemas.schemas import PackageFilter, PaginationParams
+from src.schemas.package_stats import PackageStatsResponse
+from src.schemas.schemas import (
+    ExportFormat,
+    PackageExportParams,
+    PackageFieldsParams,
+    MAX_NAME_QUERY_LENGTH,
+    PackageFilter,
+    PaginationParams,
+)
+from src.utils.currency_utils import RatesUnavailableError
 from src.utils.logger import logger
+from src.utils.streaming import accepts_gzip, gzip_stream
 
 router = APIRouter()
 
@@ -26,16 +50,33 @@ router = APIRouter()
 @router.post("/packages", response_model=PackageCreateResponse)
 async def create_package_for_user(
     package_data: PackageCreate,
+    request: Request,
     session_id: str = Depends(get_session_id),
     session_db: AsyncSession = Depends(get_db),
 ) -> PackageCreateResponse:
+    await _check_contents_value(package_data, request.app.state.redis)
     try:
-        return await _create_package(package_data, session_id, session_db)
+        return await _create_package(
+            package_data, session_id, session_db, request.app.state.redis
+        )
     except Exception as err:
         logger.error(err)
         raise HTTPException(status_code=503, detail=f"Database error:{err}")
 
 
+@router.post("/quote", response_model=QuoteResponse)
+async def quote_delivery(body: QuoteRequest, request: Request) -> QuoteResponse:
+    try:
+        return await _quote_delivery(body, request.app.state.redis)
+    except RatesUnavailableError as err:
+        logger.warning("Quote rejected: %s", err)
+        raise HTTPException(
+            status_code=503,
+            detail="Currency rates are temporarily unavailable",
+            headers={"Retry-After": "5"},
+        )
+
+
 @router.get("/package-types", response_model=PackageTypeList)
 async def get_all_types(db: AsyncSession = Depends(get_db)) -> PackageTypeList:
     list_types = await _get_list_types_packages(db)
@@ -50,44 +91,151 @@ async def get_all_types(db: AsyncSession = Depends(get_db)) -> PackageTypeList:
 async def get_my_packages(
     type_id_for_filter: UUID | None = None,
     has_calculated_cost: bool | None = None,
+    q: str | None = None,
     page: int | None = None,
     page_size: int | None = None,
+    fields: str | None = None,
     session_id: str = Depends(get_session_id),
     session_db: AsyncSession = Depends(get_db),
 ) -> PackageListResponse:
+    fieldset = _parse_fieldset(fields)
+    filters = _build_filter(type_id_for_filter, has_calculated_cost, q)
     try:
-        filters = PackageFilter(
-            type_id=type_id_for_filter, has_calculated_cost=has_calculated_cost
-        )
-
         pagination = PaginationParams(page=page, page_size=page_size)
-        logger.info(
-            f"Pagination params - page: {pagination.page}, page_size: {pagination.page_size}"
+        logger.debug(
+            "Pagination params - page: %s, page_size: %s",
+            pagination.page,
+            pagination.page_size,
         )
 
         list_package_user = await _get_user_packages_with_filters(
-            filters, pagination, session_id, session_db
+            filters, pagination, session_id, session_db, fields=fieldset.fields
         )
     except Exception as err:
-        logger.error(f"Error getting user packages: {err}")
+        logger.error("Error getting user packages: %s", err)
         raise HTTPException(status_code=500, detail="Internal server error")
 
+    if fieldset.fields is not None:
+        return JSONResponse(jsonable_encoder(list_package_user, exclude_unset=True))
     return list_package_user
 
 
+@router.get("/packages/export")
+async def export_my_packages(
+    format: ExportFormat = ExportFormat.NDJSON,
+    fields: str | None = None,
+    type_id_for_filter: UUID | None = None,
+    has_calculated_cost: bool | None = None,
+    q: str | None = None,
+    accept_encoding: str | None = Header(None),
+    session_id: str = Depends(get_session_id),
+    session_db: AsyncSession = Depends(get_db),
+) -> StreamingResponse:
+    try:
+        params = PackageExportParams(format=format, fields=fields)
+    except ValidationError as err:
+        raise HTTPException(status_code=400, detail=err.errors()[0]["msg"])
+
+    filters = _build_filter(type_id_for_filter, has_calculated_cost, q)
+    body = _export_user_packages(filters, params, session_id, session_db)
+
+    media_type = (
+        "text/csv; charset=utf-8"
+        if params.format == ExportFormat.CSV
+        else "application/x-ndjson"
+    )
+    headers = {
+        "Content-Disposition": f'attachment; filename="packages.{params.format.value}"',
+        "Vary": "Accept-Encoding",
+    }
+    if accepts_gzip(accept_encoding):
+        body = gzip_stream(body)
+        headers["Content-Encoding"] = "gzip"
+
+    return StreamingResponse(body, media_type=media_type, headers=headers)
+
+
+@router.get("/packages/suggest", response_model=PackageSuggestResponse)
+async def suggest_my_packages(
+    request: Request,
+    q: str = Query(..., min_length=1, max_length=MAX_NAME_QUERY_LENGTH),
+    limit: int = Query(10, ge=1, le=20),
+    session_id: str = Depends(get_session_id),
+    session_db: AsyncSession = Depends(get_db),
+) -> PackageSuggestResponse:
+    name_query = q.strip()
+    if not name_query:
+        return PackageSuggestResponse(suggestions=[])
+    try:
+        return await _suggest_packages(
+            name_query,
+            limit,
+            session_id,
+            session_db,
+            getattr(request.app.state, "redis", None),
+        )
+    except Exception as err:
+        logger.error("Error suggesting packages: %s", err)
+        raise HTTPException(status_code=500, detail="Internal server error")
+
+
+@router.get("/packages/stats", response_model=PackageStatsResponse)
+async def get_my_packages_stats(
+    session_id: str = Depends(get_session_id),
+    session_db: AsyncSession = Depends(get_db),
+) -> PackageStatsResponse:
+    try:
+        return await _get_package_stats(session_id, session_db)
+    except Exception as err:
+        logger.error("Error getting package stats: %s", err)
+        raise HTTPException(status_code=500, detail="Internal server error")
+
+
+@router.post("/packages/lookup", response_model=PackageLookupResponse)
+async def lookup_my_packages(
+    body: PackageLookupRequest,
+    session_id: str = Depends(get_session_id),
+    session_db: AsyncSession = Depends(get_db),
+) -> PackageLookupResponse:
+    try:
+        return await _lookup_packages_by_ids(body.ids, session_id, session_db)
+    except Exception as err:
+        logger.error("Error looking up packages: %s", err)
+        raise HTTPException(status_code=500, detail="Internal server error")
+
+
 @router.get("/{package_id}", response_model=PackageResponse)
 async def get_info_package_by_id(
     package_id: UUID,
+    fields: str | None = None,
     session_id: str = Depends(get_session_id),
     session_db: AsyncSession = Depends(get_db),
 ):
-    requested_package = await _get_package_by_id(package_id, session_id, session_db)
+    fieldset = _parse_fieldset(fields)
+    requested_package = await _get_package_by_id(
+        package_id, session_id, session_db, fields=fieldset.fields
+    )
 
     if not requested_package:
         raise HTTPException(status_code=404, detail="Package not found")
-    requested_package.delivery_cost_rub = (
-        f"{requested_package.delivery_cost_rub} RUB"
-        if requested_package.delivery_cost_rub
-        else "Не рассчитано"
-    )
+    if fieldset.fields is not None:
+        return JSONResponse(jsonable_encoder(requested_package, exclude_unset=True))
     return requested_package
+
+
+def _build_filter(
+    type_id: UUID | None, has_calculated_cost: bool | None, q: str | None
+) -> PackageFilter:
+    try:
+        return PackageFilter(
+            type_id=type_id, has_calculated_cost=has_calculated_cost, q=q
+        )
+    except ValidationError as err:
+        raise HTTPException(status_code=400, detail=err.errors()[0]["msg"])
+
+
+def _parse_fieldset(fields: str | None) -> PackageFieldsParams:
+    try:
+        return PackageFieldsParams(fields=fields)
+    except ValidationError as err:
+        raise HTTPException(status_code=400, detail=err.errors()[0]["msg"])
@@ -7,7 +7,14 @@ from sqlalchemy.orm import sessionmaker
 from src.settings import settings
 
 
-engine = create_async_engine(settings.DATABASE_URL, future=True, echo=True)
+# SQL echo is enabled through the ``sqlalchemy.engine`` logger (settings.SQL_ECHO)
+# so statements go through the queued logging pipeline, not a blocking handler.
+engine = create_async_engine(
+    settings.DATABASE_URL,
+    future=True,
+    pool_size=settings.DB_POOL_SIZE,
+    max_overflow=settings.DB_MAX_OVERFLOW,
+)
 
 async_session = sessionmaker(engine, expire_on_commit=False, class_=AsyncSession)
 
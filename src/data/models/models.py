@@ -1,10 +1,14 @@
 import uuid
 from sqlalchemy import (
     Column,
+    DateTime,
     String,
     ForeignKey,
     Numeric,
     Index,
+    Integer,
+    UniqueConstraint,
+    func,
 )
 from sqlalchemy.orm import relationship, declarative_base
 from sqlalchemy.dialects.postgresql import UUID
@@ -34,8 +38,14 @@ class Package(Base):
         ForeignKey("package_types.id", ondelete="RESTRICT"),
         nullable=True,
     )
-    contents_value_usd = Column(Numeric(12, 2), nullable=False)
+    # Declared contents value, denominated in ``contents_currency``.
+    contents_value = Column(Numeric(12, 2), nullable=False)
+    contents_currency = Column(
+        String(3), nullable=False, default="USD", server_default="USD"
+    )
     delivery_cost_rub = Column(Numeric(14, 2), nullable=True)
+    # ``contents_value`` in USD at the rate used for pricing; set with the cost.
+    priced_contents_value_usd = Column(Numeric(12, 2), nullable=True)
     owner_session_id = Column(String(128), nullable=False, index=True)
 
     package_type = relationship("PackageType", back_populates="packages", lazy="joined")
@@ -43,9 +53,88 @@ class Package(Base):
     __table_args__ = (
         Index("ix_packages_owner_type", "owner_session_id", "type_id"),
         Index("ix_packages_owner_delivery", "owner_session_id", "delivery_cost_rub"),
+        Index(
+            "ix_packages_owner_name_trgm",
+            "owner_session_id",
+            "name",
+            postgresql_using="gin",
+            postgresql_ops={"name": "gin_trgm_ops"},
+        ),
+        # Keyset walk of the pricing backlog (see calculating_cost_parcel).
+        Index(
+            "ix_packages_unpriced",
+            "id",
+            postgresql_where=delivery_cost_rub.is_(None),
+        ),
     )
 
     def __repr__(self):
         return (
             f"<Package id={self.id} name={self.name!r} owner={self.owner_session_id}>"
         )
+
+
+# API fields backed by a differently named column: ``contents_value_usd`` is the
+# name ``contents_value`` had before currencies, still returned to clients.
+PACKAGE_FIELD_COLUMNS = {"contents_value_usd": "contents_value"}
+
+
+class PackageStats(Base):
+    """Incrementally maintained per-session / per-type rollup of ``packages``.
+
+    ``total_contents_value_usd`` counts USD-declared parcels when they are created
+    and parcels declared in other currencies once they are priced, converted
+    at the rate used for pricing (``Package.priced_contents_value_usd``).
+    """
+
+    __tablename__ = "package_stats"
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    owner_session_id = Column(String(128), nullable=False)
+    type_id = Column(UUID(as_uuid=True), nullable=True)
+    package_count = Column(Integer, nullable=False, default=0, server_default="0")
+    total_weight_kg = Column(
+        Numeric(16, 3), nullable=False, default=0, server_default="0"
+    )
+    total_contents_value_usd = Column(
+        Numeric(18, 2), nullable=False, default=0, server_default="0"
+    )
+    calculated_count = Column(Integer, nullable=False, default=0, server_default="0")
+    total_delivery_cost_rub = Column(
+        Numeric(20, 2), nullable=False, default=0, server_default="0"
+    )
+
+    __table_args__ = (
+        UniqueConstraint(
+            "owner_session_id",
+            "type_id",
+            name="uq_package_stats_owner_type",
+            postgresql_nulls_not_distinct=True,
+        ),
+    )
+
+    def __repr__(self):
+        return (
+            f"<PackageStats owner={self.owner_session_id} type_id={self.type_id} "
+            f"count={self.package_count}>"
+        )
+
+
+class PackageArchive(Base):
+    """Packages of expired sessions moved out of ``packages`` by the retention job."""
+
+    __tablename__ = "packages_archive"
+    id = Column(UUID(as_uuid=True), primary_key=True)
+    name = Column(String(255), nullable=False)
+    weight_kg = Column(Numeric(10, 3), nullable=False)
+    type_id = Column(UUID(as_uuid=True), nullable=True)
+    contents_value = Column(Numeric(12, 2), nullable=False)
+    contents_currency = Column(String(3), nullable=False)
+    delivery_cost_rub = Column(Numeric(14, 2), nullable=True)
+    priced_contents_value_usd = Column(Numeric(12, 2), nullable=True)
+    owner_session_id = Column(String(128), nullable=False, index=True)
+    archived_at = Column(
+        DateTime(timezone=True), nullable=False, server_default=func.now()
+    )
+
+    def __repr__(self):
+        return f"<PackageArchive id={self.id} owner={self.owner_session_id}>"
@@ -0,0 +1,99 @@
+from abc import ABC, abstractmethod
+from decimal import Decimal
+from typing import AsyncContextManager, AsyncIterator, Sequence
+from uuid import UUID
+
+from src.data.models.models import Package, PackageType
+
+
+class PackageRepository(ABC):
+    """Package storage as seen by the service layer.
+
+    ``UserDAL`` implements it on Postgres; ``MemoryPackageRepository`` keeps
+    everything in process. Services get one from ``get_package_repository`` and
+    wrap writes in ``transaction()`` instead of touching the session directly.
+    """
+
+    @abstractmethod
+    def transaction(self) -> AsyncContextManager:
+        """Unit of work: committed on exit, rolled back on error."""
+
+    @abstractmethod
+    async def create_package(
+        self,
+        name: str,
+        weight_kg: Decimal,
+        type_id: UUID,
+        contents_value: Decimal,
+        owner_session_id: str,
+        contents_currency: str = "USD",
+    ) -> Package: ...
+
+    @abstractmethod
+    async def get_all_types_packages(self) -> list[PackageType]: ...
+
+    @abstractmethod
+    async def get_package_type_by_id(self, type_id: UUID) -> PackageType | None: ...
+
+    @abstractmethod
+    async def get_package_by_id(
+        self,
+        package_id: UUID,
+        owner_session_id: str,
+        fields: Sequence[str] | None = None,
+    ) -> Package | None: ...
+
+    @abstractmethod
+    async def get_packages_by_ids(
+        self, package_ids: Sequence[UUID], owner_session_id: str
+    ) -> list[Package]: ...
+
+    @abstractmethod
+    async def suggest_packages(
+        self, owner_session_id: str, name_query: str, limit: int = 10
+    ) -> list:
+        """Objects with ``id`` and ``name``: prefix matches first."""
+
+    @abstractmethod
+    async def get_user_packages(self, owner_session_id: str) -> list[Package]:
+        """Every package of a session, with ``package_type`` loaded."""
+
+    @abstractmethod
+    async def get_user_packages_with_pagination(
+        self,
+        owner_session_id: str,
+        type_id: UUID | None = None,
+        has_calculated_cost: bool | None = None,
+        name_query: str | None = None,
+        skip: int = 0,
+        limit: int = 100,
+        fields: Sequence[str] | None = None,
+    ) -> tuple[list[Package], int]:
+        """One page ordered by ``weight_kg`` descending, and the filtered total."""
+
+    @abstractmethod
+    def stream_user_packages(
+        self,
+        owner_session_id: str,
+        columns: Sequence[str],
+        type_id: UUID | None = None,
+        has_calculated_cost: bool | None = None,
+        name_query: str | None = None,
+        batch_size: int = 1000,
+    ) -> AsyncIterator[tuple]: ...
+
+    @abstractmethod
+    async def increment_package_stats(
+        self,
+        owner_session_id: str,
+        type_id: UUID | None,
+        package_count: int = 0,
+        total_weight_kg: Decimal = Decimal("0"),
+        total_contents_value_usd: Decimal = Decimal("0"),
+        calculated_count: int = 0,
+        total_delivery_cost_rub: Decimal = Decimal("0"),
+    ) -> None: ...
+
+    @abstractmethod
+    async def get_package_stats(self, owner_session_id: str) -> list:
+        """Per-type rollup rows (``type_id``, ``type_name`` and the counters)."""
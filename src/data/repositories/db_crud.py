@@ -1,34 +1,68 @@
 import logging
 from decimal import Decimal
-from sqlalchemy.orm import selectinload
+from typing import AsyncContextManager, AsyncIterator, Sequence
+from sqlalchemy.orm import load_only, noload, selectinload
 
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import func, select, and_
+from sqlalchemy import (
+    Row,
+    Select,
+    and_,
+    any_,
+    bindparam,
+    case,
+    delete,
+    func,
+    select,
+    text,
+    update,
+)
+from sqlalchemy.dialects.postgresql import ARRAY, UUID as PG_UUID, insert
 from uuid import UUID
-from src.data.models.models import Package, PackageType
+from src.data.models.models import (
+    PACKAGE_FIELD_COLUMNS,
+    Package,
+    PackageStats,
+    PackageType,
+)
+from src.data.repositories.base import PackageRepository
+from src.utils.tracing import traced_methods
 
 logger = logging.getLogger(__name__)
 
 
-class UserDAL:
+LIKE_ESCAPE = "!"
+
+
+def _escape_like(value: str) -> str:
+    return value.replace("!", "!!").replace("%", "!%").replace("_", "!_")
+
+
+@traced_methods("dal")
+class UserDAL(PackageRepository):
     """Data access level for interaction with the application"""
 
     def __init__(self, db_session: AsyncSession):
         self.db_session = db_session
 
+    def transaction(self) -> AsyncContextManager:
+        return self.db_session.begin()
+
     async def create_package(
         self,
         name: str,
         weight_kg: Decimal,
         type_id: UUID,
-        contents_value_usd: Decimal,
+        contents_value: Decimal,
         owner_session_id: str,
+        contents_currency: str = "USD",
     ) -> Package:
         new_package = Package(
             name=name,
             weight_kg=weight_kg,
             type_id=type_id,
-            contents_value_usd=contents_value_usd,
+            contents_value=contents_value,
+            contents_currency=contents_currency,
             owner_session_id=owner_session_id,
         )
         self.db_session.add(new_package)
@@ -36,14 +70,23 @@ class UserDAL:
         return new_package
 
     async def get_all_types_packages(self) -> list[PackageType]:
-        query = select(PackageType).order_by(PackageType.id)
+        # PackageType.packages is selectin-loaded by default, which would pull
+        # every package of every type.
+        query = (
+            select(PackageType)
+            .options(noload(PackageType.packages))
+            .order_by(PackageType.id)
+        )
         result = await self.db_session.execute(query)
         if result is None:
             return []
         return result.scalars().all()
 
     async def get_package_by_id(
-        self, package_id: UUID, owner_session_id: str
+        self,
+        package_id: UUID,
+        owner_session_id: str,
+        fields: Sequence[str] | None = None,
     ) -> Package | None:
         query = (
             select(Package)
@@ -53,28 +96,80 @@ class UserDAL:
                     Package.owner_session_id == owner_session_id,
                 )
             )
-            .options(selectinload(Package.package_type))
+            .options(*self._package_load_options(fields))
         )
         result = await self.db_session.execute(query)
         return result.scalar_one_or_none()
 
+    async def get_packages_by_ids(
+        self, package_ids: Sequence[UUID], owner_session_id: str
+    ) -> list[Package]:
+        """Fetch several owner-scoped packages with a single ``id = ANY(:ids)`` query."""
+        ids_param = bindparam(
+            "package_ids", list(package_ids), type_=ARRAY(PG_UUID(as_uuid=True))
+        )
+        query = (
+            select(Package)
+            .where(
+                and_(
+                    Package.id == any_(ids_param),
+                    Package.owner_session_id == owner_session_id,
+                )
+            )
+            .options(selectinload(Package.package_type))
+        )
+        result = await self.db_session.execute(query)
+        return result.scalars().all()
+
+    async def suggest_packages(
+        self, owner_session_id: str, name_query: str, limit: int = 10
+    ) -> list[Row]:
+        """Typeahead over package names: prefix matches first, then by similarity."""
+        escaped = _escape_like(name_query)
+        query = (
+            select(Package.id, Package.name)
+            .where(
+                Package.owner_session_id == owner_session_id,
+                Package.name.ilike(f"%{escaped}%", escape=LIKE_ESCAPE),
+            )
+            .order_by(
+                Package.name.ilike(f"{escaped}%", escape=LIKE_ESCAPE).desc(),
+                func.similarity(Package.name, name_query).desc(),
+                Package.name,
+            )
+            .limit(limit)
+        )
+        result = await self.db_session.execute(query)
+        return result.all()
+
     async def get_package_type_by_id(self, type_id: UUID) -> PackageType | None:
         query = select(PackageType).where(PackageType.id == type_id)
         result = await self.db_session.execute(query)
         return result.scalar_one_or_none()
 
+    async def get_user_packages(self, owner_session_id: str) -> list[Package]:
+        query = (
+            select(Package)
+            .where(Package.owner_session_id == owner_session_id)
+            .options(selectinload(Package.package_type))
+        )
+        result = await self.db_session.execute(query)
+        return result.scalars().all()
+
     async def get_user_packages_with_pagination(
         self,
         owner_session_id: str,
         type_id: UUID | None = None,
         has_calculated_cost: bool | None = None,
+        name_query: str | None = None,
         skip: int = 0,
         limit: int = 100,
+        fields: Sequence[str] | None = None,
     ) -> (list[Package], int):
         query = (
             select(Package)
             .where(Package.owner_session_id == owner_session_id)
-            .options(selectinload(Package.package_type))
+            .options(*self._package_load_options(fields))
         )
 
         count_query = (
@@ -83,17 +178,12 @@ class UserDAL:
             .where(Package.owner_session_id == owner_session_id)
         )
 
-        if type_id is not None:
-            query = query.where(Package.type_id == type_id)
-            count_query = count_query.where(Package.type_id == type_id)
-
-        if has_calculated_cost is not None:
-            if has_calculated_cost:
-                query = query.where(Package.delivery_cost_rub.is_not(None))
-                count_query = count_query.where(Package.delivery_cost_rub.is_not(None))
-            else:
-                query = query.where(Package.delivery_cost_rub.is_(None))
-                count_query = count_query.where(Package.delivery_cost_rub.is_(None))
+        query = self._apply_package_filters(
+            query, type_id, has_calculated_cost, name_query
+        )
+        count_query = self._apply_package_filters(
+            count_query, type_id, has_calculated_cost, name_query
+        )
 
         query = query.order_by(Package.weight_kg.desc()).offset(skip).limit(limit)
 
@@ -105,3 +195,319 @@ class UserDAL:
         total = count_result.scalar_one()
 
         return packages, total
+
+    async def stream_user_packages(
+        self,
+        owner_session_id: str,
+        columns: Sequence[str],
+        type_id: UUID | None = None,
+        has_calculated_cost: bool | None = None,
+        name_query: str | None = None,
+        batch_size: int = 1000,
+    ) -> AsyncIterator[Row]:
+        """Yield rows with the requested ``packages`` columns via a server-side cursor.
+
+        Only plain columns are selected (no ORM entities, no type join), so memory
+        stays bounded by ``batch_size`` regardless of the session size.
+        """
+        query = select(
+            *(
+                Package.__table__.c[PACKAGE_FIELD_COLUMNS.get(name, name)].label(name)
+                for name in columns
+            )
+        ).where(Package.owner_session_id == owner_session_id)
+        query = self._apply_package_filters(
+            query, type_id, has_calculated_cost, name_query
+        )
+        query = query.order_by(Package.weight_kg.desc(), Package.id).execution_options(
+            yield_per=batch_size
+        )
+
+        result = await self.db_session.stream(query)
+        try:
+            async for row in result:
+                yield row
+        finally:
+            await result.close()
+
+    async def lock_unpriced_packages_batch(
+        self, after_id: UUID | None, limit: int
+    ) -> list[Package]:
+        """Lock the next ``limit`` packages without a delivery cost, in id order.
+
+        Rows locked by another transaction are skipped. ``after_id`` is the last
+        id of the previous batch, so rows that could not be priced are not read
+        again within the same sweep.
+        """
+        query = (
+            select(Package)
+            .options(noload(Package.package_type))
+            .where(Package.delivery_cost_rub.is_(None))
+        )
+        if after_id is not None:
+            query = query.where(Package.id > after_id)
+        query = (
+            query.order_by(Package.id).limit(limit).with_for_update(skip_locked=True)
+        )
+
+        result = await self.db_session.execute(query)
+        return result.scalars().all()
+
+    async def set_delivery_costs(
+        self, costs: Sequence[tuple[UUID, str, Decimal, Decimal | None]]
+    ) -> None:
+        """Store ``(id, owner_session_id, delivery_cost_rub, priced_value_usd)``.
+
+        One executemany ``UPDATE``. The owner is part of the predicate so that on a
+        hash-partitioned ``packages`` (see 0b9e7d2c4f18) each row is looked up in
+        its own partition instead of in every partition.
+        """
+        if not costs:
+            return
+        packages = Package.__table__
+        query = (
+            update(packages)
+            .where(
+                packages.c.id == bindparam("b_id"),
+                packages.c.owner_session_id == bindparam("b_owner"),
+            )
+            .values(
+                delivery_cost_rub=bindparam("b_cost"),
+                priced_contents_value_usd=bindparam("b_value_usd"),
+            )
+        )
+        await self.db_session.execute(
+            query,
+            [
+                {
+                    "b_id": package_id,
+                    "b_owner": owner_session_id,
+                    "b_cost": cost,
+                    "b_value_usd": value_usd,
+                }
+                for package_id, owner_session_id, cost, value_usd in costs
+            ],
+        )
+
+    async def count_unpriced_packages(self) -> int:
+        result = await self.db_session.execute(
+            select(func.count())
+            .select_from(Package)
+            .where(Package.delivery_cost_rub.is_(None))
+        )
+        return result.scalar_one()
+
+    async def increment_package_stats(
+        self,
+        owner_session_id: str,
+        type_id: UUID | None,
+        package_count: int = 0,
+        total_weight_kg: Decimal = Decimal("0"),
+        total_contents_value_usd: Decimal = Decimal("0"),
+        calculated_count: int = 0,
+        total_delivery_cost_rub: Decimal = Decimal("0"),
+    ) -> None:
+        """Add deltas to the (owner, type) rollup row, creating it on first use."""
+        query = insert(PackageStats).values(
+            owner_session_id=owner_session_id,
+            type_id=type_id,
+            package_count=package_count,
+            total_weight_kg=total_weight_kg,
+            total_contents_value_usd=total_contents_value_usd,
+            calculated_count=calculated_count,
+            total_delivery_cost_rub=total_delivery_cost_rub,
+        )
+        stats = PackageStats.__table__.c
+        query = query.on_conflict_do_update(
+            constraint="uq_package_stats_owner_type",
+            set_={
+                name: stats[name] + query.excluded[name]
+                for name in (
+                    "package_count",
+                    "total_weight_kg",
+                    "total_contents_value_usd",
+                    "calculated_count",
+                    "total_delivery_cost_rub",
+                )
+            },
+        )
+        await self.db_session.execute(query)
+
+    async def get_package_stats(self, owner_session_id: str) -> list[Row]:
+        """Read the precomputed per-type rollup rows of a session."""
+        query = (
+            select(
+                PackageStats.type_id,
+                PackageType.name.label("type_name"),
+                PackageStats.package_count,
+                PackageStats.total_weight_kg,
+                PackageStats.total_contents_value_usd,
+                PackageStats.calculated_count,
+                PackageStats.total_delivery_cost_rub,
+            )
+            .outerjoin(PackageType, PackageType.id == PackageStats.type_id)
+            .where(
+                PackageStats.owner_session_id == owner_session_id,
+                PackageStats.package_count > 0,
+            )
+            .order_by(PackageStats.package_count.desc())
+        )
+        result = await self.db_session.execute(query)
+        return result.all()
+
+    async def get_package_stats_raw(
+        self,
+        owner_session_id: str,
+        usd_factors: dict[str, Decimal] | None = None,
+    ) -> list[Row]:
+        """Same shape as ``get_package_stats`` but aggregated over ``packages``.
+
+        Kept as the reference implementation for benchmarks and consistency checks.
+        ``usd_factors`` (currency -> USD per unit) converts priced non-USD parcels
+        that have no stored ``priced_contents_value_usd`` (priced before it existed).
+        """
+        query = (
+            select(
+                Package.type_id,
+                PackageType.name.label("type_name"),
+                *self._package_stats_columns(usd_factors),
+            )
+            .outerjoin(PackageType, PackageType.id == Package.type_id)
+            .where(Package.owner_session_id == owner_session_id)
+            .group_by(Package.type_id, PackageType.name)
+            .order_by(func.count().desc())
+        )
+        result = await self.db_session.execute(query)
+        return result.all()
+
+    async def rebuild_package_stats(
+        self,
+        owner_session_id: str | None = None,
+        usd_factors: dict[str, Decimal] | None = None,
+    ) -> int:
+        """Recompute rollup rows from ``packages`` (all sessions or a single one).
+
+        Must run inside a transaction. ``package_stats`` is locked in SHARE ROW
+        EXCLUSIVE mode first: it conflicts with the ROW EXCLUSIVE lock every
+        ``increment_package_stats`` upsert takes, so writers that already touched
+        the rollup commit before the aggregate is read, and later ones wait and
+        apply their deltas on top of the rebuilt rows. Readers are not blocked.
+        """
+        await self.db_session.execute(
+            text("LOCK TABLE package_stats IN SHARE ROW EXCLUSIVE MODE")
+        )
+        delete_query = delete(PackageStats)
+        source = select(
+            func.gen_random_uuid(),
+            Package.owner_session_id,
+            Package.type_id,
+            *self._package_stats_columns(usd_factors),
+        ).group_by(Package.owner_session_id, Package.type_id)
+
+        if owner_session_id is not None:
+            delete_query = delete_query.where(
+                PackageStats.owner_session_id == owner_session_id
+            )
+            source = source.where(Package.owner_session_id == owner_session_id)
+
+        await self.db_session.execute(delete_query)
+        result = await self.db_session.execute(
+            insert(PackageStats).from_select(
+                [
+                    "id",
+                    "owner_session_id",
+                    "type_id",
+                    "package_count",
+                    "total_weight_kg",
+                    "total_contents_value_usd",
+                    "calculated_count",
+                    "total_delivery_cost_rub",
+                ],
+                source,
+            )
+        )
+        return result.rowcount
+
+    @staticmethod
+    def _package_stats_columns(
+        usd_factors: dict[str, Decimal] | None = None,
+    ) -> list:
+        # Mirrors the incremental path: USD values count from creation, other
+        # currencies once priced, at the USD equivalent stored with the cost.
+        # ``usd_factors`` only covers parcels priced before that was stored.
+        contents_value_usd = case(
+            (Package.contents_currency == "USD", Package.contents_value),
+            (
+                Package.priced_contents_value_usd.is_not(None),
+                Package.priced_contents_value_usd,
+            ),
+            *(
+                (
+                    and_(
+                        Package.contents_currency == currency,
+                        Package.delivery_cost_rub.is_not(None),
+                    ),
+                    func.round(Package.contents_value * factor, 2),
+                )
+                for currency, factor in (usd_factors or {}).items()
+                if currency != "USD"
+            ),
+            else_=0,
+        )
+        return [
+            func.count().label("package_count"),
+            func.coalesce(func.sum(Package.weight_kg), 0).label("total_weight_kg"),
+            func.coalesce(func.sum(contents_value_usd), 0).label(
+                "total_contents_value_usd"
+            ),
+            func.count(Package.delivery_cost_rub).label("calculated_count"),
+            func.coalesce(func.sum(Package.delivery_cost_rub), 0).label(
+                "total_delivery_cost_rub"
+            ),
+        ]
+
+    @staticmethod
+    def _package_load_options(fields: Sequence[str] | None = None) -> list:
+        """Loader options that fetch only the columns behind the requested fields.
+
+        ``None`` keeps the full entity. The ``package_type`` relationship is only
+        loaded (and ``type_id`` only selected) when it was asked for; otherwise the
+        default joined load is disabled so the type join disappears from the SQL.
+        """
+        if fields is None:
+            return [selectinload(Package.package_type)]
+
+        columns = [Package.id]
+        columns.extend(
+            getattr(Package, PACKAGE_FIELD_COLUMNS.get(name, name))
+            for name in fields
+            if name not in ("id", "package_type")
+        )
+        if "package_type" in fields:
+            columns.append(Package.type_id)
+            return [load_only(*columns), selectinload(Package.package_type)]
+        return [load_only(*columns), noload(Package.package_type)]
+
+    @staticmethod
+    def _apply_package_filters(
+        query: Select,
+        type_id: UUID | None = None,
+        has_calculated_cost: bool | None = None,
+        name_query: str | None = None,
+    ) -> Select:
+        if type_id is not None:
+            query = query.where(Package.type_id == type_id)
+
+        if has_calculated_cost is not None:
+            if has_calculated_cost:
+                query = query.where(Package.delivery_cost_rub.is_not(None))
+            else:
+                query = query.where(Package.delivery_cost_rub.is_(None))
+
+        if name_query:
+            # Served by the (owner_session_id, name gin_trgm_ops) GIN index.
+            query = query.where(
+                Package.name.ilike(f"%{_escape_like(name_query)}%", escape=LIKE_ESCAPE)
+            )
+
+        return query
@@ -0,0 +1,53 @@
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.data.db.session import async_session
+from src.data.repositories.base import PackageRepository
+from src.data.repositories.db_crud import UserDAL
+from src.data.repositories.memory import (
+    PACKAGE_ROW_COLUMNS,
+    CachedPackageRepository,
+    HotPackageCache,
+    MemoryPackageRepository,
+    PackageRow,
+    PackageTypeRow,
+)
+from src.settings import settings
+
+
+async def _load_hot_packages(owner_session_id: str) -> list[PackageRow]:
+    # Runs outside any request, so it has its own session and reads plain rows.
+    async with async_session() as session_db:
+        user_dal = UserDAL(session_db)
+        package_types = {
+            item.id: PackageTypeRow(item.id, item.name, item.description)
+            for item in await user_dal.get_all_types_packages()
+        }
+        return [
+            PackageRow(*row, package_type=package_types.get(row.type_id))
+            async for row in user_dal.stream_user_packages(
+                owner_session_id, PACKAGE_ROW_COLUMNS
+            )
+        ]
+
+
+_hot_cache = HotPackageCache(
+    max_owners=settings.HOT_CACHE_MAX_OWNERS,
+    ttl=settings.HOT_CACHE_TTL_SECONDS,
+    loader=_load_hot_packages,
+)
+
+
+def get_package_repository(session_db: AsyncSession | None) -> PackageRepository:
+    """Repository for the configured ``REPOSITORY_BACKEND``.
+
+    ``session_db`` is unused by the memory backend and may be ``None`` there.
+    """
+    if settings.REPOSITORY_BACKEND == "memory":
+        return MemoryPackageRepository()
+
+    user_dal = UserDAL(session_db)
+    if settings.HOT_CACHE_ENABLED:
+        return CachedPackageRepository(
+            user_dal, _hot_cache, min_packages=settings.HOT_CACHE_MIN_PACKAGES
+        )
+    return user_dal
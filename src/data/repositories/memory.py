@@ -0,0 +1,623 @@
+import asyncio
+import bisect
+import contextlib
+import itertools
+import logging
+import time
+import uuid
+from collections import Counter, OrderedDict
+from decimal import Decimal
+from typing import (
+    AsyncContextManager,
+    AsyncIterator,
+    Awaitable,
+    Callable,
+    Iterator,
+    NamedTuple,
+    Sequence,
+)
+from uuid import UUID
+
+from sqlalchemy.orm.attributes import set_committed_value
+
+from src.data.models.models import PACKAGE_FIELD_COLUMNS, Package, PackageType
+from src.data.repositories.base import PackageRepository
+
+logger = logging.getLogger(__name__)
+
+# Seeded into every MemoryStore, with the ids used in the README examples.
+DEFAULT_PACKAGE_TYPES = (
+    (
+        UUID("550e8400-e29b-41d4-a716-446655440000"),
+        "Электроника",
+        "Хрупкие электронные устройства",
+    ),
+    (
+        UUID("550e8400-e29b-41d4-a716-446655440001"),
+        "Одежда",
+        "Текстильные изделия",
+    ),
+    (UUID("550e8400-e29b-41d4-a716-446655440002"), "Разное", None),
+)
+
+
+class PackageStatsRow(NamedTuple):
+    type_id: UUID | None
+    type_name: str | None
+    package_count: int
+    total_weight_kg: Decimal
+    total_contents_value_usd: Decimal
+    calculated_count: int
+    total_delivery_cost_rub: Decimal
+
+
+class PackageTypeRow(NamedTuple):
+    id: UUID
+    name: str
+    description: str | None
+
+
+class PackageRow(NamedTuple):
+    """Plain copy of a ``packages`` row and its type, safe to share across requests."""
+
+    id: UUID
+    name: str
+    weight_kg: Decimal
+    type_id: UUID | None
+    contents_value: Decimal
+    contents_currency: str
+    delivery_cost_rub: Decimal | None
+    owner_session_id: str
+    package_type: PackageTypeRow | None = None
+
+
+# Columns ``PackageRow`` is built from, in field order.
+PACKAGE_ROW_COLUMNS = PackageRow._fields[:-1]
+
+
+class OwnerPackageIndex:
+    """Packages of one session kept sorted by ``weight_kg`` descending.
+
+    ``counts`` holds the number of packages per ``(type_id, priced)`` pair, so
+    totals for the type / calculated-cost filters never scan the packages, and
+    an unfiltered page is a plain slice. Holds ``Package`` objects in the memory
+    backend and immutable ``PackageRow`` copies in the hot cache.
+    """
+
+    def __init__(self, packages: Sequence[Package | PackageRow] = ()):
+        self._keys: list[tuple[Decimal, int]] = []
+        self._packages: list[Package | PackageRow] = []
+        self._key_by_id: dict[UUID, tuple[Decimal, int]] = {}
+        self._sequence = itertools.count()
+        self.by_id: dict[UUID, Package | PackageRow] = {}
+        self.counts: Counter[tuple[UUID | None, bool]] = Counter()
+        # One sort instead of a list insert per package; the sort is stable, so
+        # equal weights keep their order as with ``add``.
+        for package in sorted(packages, key=lambda item: -item.weight_kg):
+            key = (-package.weight_kg, next(self._sequence))
+            self._keys.append(key)
+            self._packages.append(package)
+            self._key_by_id[package.id] = key
+            self.by_id[package.id] = package
+            self.counts[(package.type_id, package.delivery_cost_rub is not None)] += 1
+
+    def __len__(self) -> int:
+        return len(self._packages)
+
+    def add(self, package: Package | PackageRow) -> None:
+        # The sequence number keeps equal weights in insertion order.
+        key = (-package.weight_kg, next(self._sequence))
+        position = bisect.bisect(self._keys, key)
+        self._keys.insert(position, key)
+        self._packages.insert(position, package)
+        self._key_by_id[package.id] = key
+        self.by_id[package.id] = package
+        self.counts[(package.type_id, package.delivery_cost_rub is not None)] += 1
+
+    def remove(self, package_id: UUID) -> Package | PackageRow | None:
+        package = self.by_id.pop(package_id, None)
+        if package is None:
+            return None
+        position = bisect.bisect_left(self._keys, self._key_by_id.pop(package_id))
+        del self._keys[position]
+        del self._packages[position]
+        self.counts[(package.type_id, package.delivery_cost_rub is not None)] -= 1
+        return package
+
+    def set_delivery_cost(self, package_id: UUID, delivery_cost_rub: Decimal) -> None:
+        package = self.by_id[package_id]
+        self.counts[(package.type_id, package.delivery_cost_rub is not None)] -= 1
+        package.delivery_cost_rub = delivery_cost_rub
+        self.counts[(package.type_id, True)] += 1
+
+    def count(
+        self, type_id: UUID | None = None, has_calculated_cost: bool | None = None
+    ) -> int:
+        return sum(
+            count
+            for (item_type_id, priced), count in self.counts.items()
+            if (type_id is None or item_type_id == type_id)
+            and (has_calculated_cost is None or priced == has_calculated_cost)
+        )
+
+    def filtered(
+        self,
+        type_id: UUID | None = None,
+        has_calculated_cost: bool | None = None,
+        name_query: str | None = None,
+    ) -> Iterator[Package | PackageRow]:
+        needle = name_query.casefold() if name_query else None
+        for package in self._packages:
+            if type_id is not None and package.type_id != type_id:
+                continue
+            if (
+                has_calculated_cost is not None
+                and (package.delivery_cost_rub is not None) != has_calculated_cost
+            ):
+                continue
+            if needle is not None and needle not in package.name.casefold():
+                continue
+            yield package
+
+    def page(
+        self,
+        type_id: UUID | None = None,
+        has_calculated_cost: bool | None = None,
+        name_query: str | None = None,
+        skip: int = 0,
+        limit: int = 100,
+    ) -> tuple[list[Package | PackageRow], int]:
+        if not name_query:
+            total = self.count(type_id, has_calculated_cost)
+            if type_id is None and has_calculated_cost is None:
+                return self._packages[skip : skip + limit], total
+            matches = self.filtered(type_id, has_calculated_cost)
+            return list(itertools.islice(matches, skip, skip + limit)), total
+
+        # A name search has no precomputed count, so the total needs a full pass.
+        matches = list(self.filtered(type_id, has_calculated_cost, name_query))
+        return matches[skip : skip + limit], len(matches)
+
+
+class MemoryStore:
+    """Process-wide data of the in-memory backend."""
+
+    def __init__(self):
+        self.owners: dict[str, OwnerPackageIndex] = {}
+        self.package_types: dict[UUID, PackageType] = {}
+        self.stats: dict[tuple[str, UUID | None], list] = {}
+        self.clear()
+
+    def clear(self) -> None:
+        """Drop all data except the ``DEFAULT_PACKAGE_TYPES``."""
+        self.owners.clear()
+        self.stats.clear()
+        self.package_types = {
+            type_id: PackageType(id=type_id, name=name, description=description)
+            for type_id, name, description in DEFAULT_PACKAGE_TYPES
+        }
+
+
+_default_store = MemoryStore()
+
+
+class MemoryPackageRepository(PackageRepository):
+    """Fully in-memory ``PackageRepository`` for local runs and benchmarks.
+
+    Selected with ``REPOSITORY_BACKEND=memory``. Data lives in the process (and
+    is lost on restart); there are no transactions, ``transaction()`` is a no-op.
+    The store starts with the ``DEFAULT_PACKAGE_TYPES``.
+    """
+
+    def __init__(self, store: MemoryStore | None = None):
+        self.store = store or _default_store
+
+    def transaction(self) -> AsyncContextManager:
+        return contextlib.nullcontext()
+
+    def add_package_type(
+        self, name: str, description: str | None = None, type_id: UUID | None = None
+    ) -> PackageType:
+        package_type = PackageType(
+            id=type_id or uuid.uuid4(), name=name, description=description
+        )
+        self.store.package_types[package_type.id] = package_type
+        return package_type
+
+    def set_delivery_cost(
+        self, owner_session_id: str, package_id: UUID, delivery_cost_rub: Decimal
+    ) -> None:
+        self.store.owners[owner_session_id].set_delivery_cost(
+            package_id, delivery_cost_rub
+        )
+
+    async def create_package(
+        self,
+        name: str,
+        weight_kg: Decimal,
+        type_id: UUID,
+        contents_value: Decimal,
+        owner_session_id: str,
+        contents_currency: str = "USD",
+    ) -> Package:
+        package = Package(
+            id=uuid.uuid4(),
+            name=name,
+            weight_kg=weight_kg,
+            type_id=type_id,
+            contents_value=contents_value,
+            contents_currency=contents_currency,
+            delivery_cost_rub=None,
+            owner_session_id=owner_session_id,
+        )
+        # Without events, so the type does not collect a backref list of packages.
+        set_committed_value(
+            package, "package_type", self.store.package_types.get(type_id)
+        )
+        self.store.owners.setdefault(owner_session_id, OwnerPackageIndex()).add(package)
+        return package
+
+    async def get_all_types_packages(self) -> list[PackageType]:
+        return sorted(self.store.package_types.values(), key=lambda item: item.id)
+
+    async def get_package_type_by_id(self, type_id: UUID) -> PackageType | None:
+        return self.store.package_types.get(type_id)
+
+    async def get_package_by_id(
+        self,
+        package_id: UUID,
+        owner_session_id: str,
+        fields: Sequence[str] | None = None,
+    ) -> Package | None:
+        index = self.store.owners.get(owner_session_id)
+        return index.by_id.get(package_id) if index else None
+
+    async def get_packages_by_ids(
+        self, package_ids: Sequence[UUID], owner_session_id: str
+    ) -> list[Package]:
+        index = self.store.owners.get(owner_session_id)
+        if index is None:
+            return []
+        return [index.by_id[item] for item in package_ids if item in index.by_id]
+
+    async def suggest_packages(
+        self, owner_session_id: str, name_query: str, limit: int = 10
+    ) -> list[Package]:
+        index = self.store.owners.get(owner_session_id)
+        if index is None:
+            return []
+        needle = name_query.casefold()
+        matches = index.filtered(name_query=name_query)
+        return sorted(
+            matches,
+            key=lambda item: (not item.name.casefold().startswith(needle), item.name),
+        )[:limit]
+
+    async def get_user_packages(self, owner_session_id: str) -> list[Package]:
+        index = self.store.owners.get(owner_session_id)
+        return list(index.filtered()) if index else []
+
+    async def get_user_packages_with_pagination(
+        self,
+        owner_session_id: str,
+        type_id: UUID | None = None,
+        has_calculated_cost: bool | None = None,
+        name_query: str | None = None,
+        skip: int = 0,
+        limit: int = 100,
+        fields: Sequence[str] | None = None,
+    ) -> tuple[list[Package], int]:
+        index = self.store.owners.get(owner_session_id)
+        if index is None:
+            return [], 0
+        return index.page(type_id, has_calculated_cost, name_query, skip, limit)
+
+    async def stream_user_packages(
+        self,
+        owner_session_id: str,
+        columns: Sequence[str],
+        type_id: UUID | None = None,
+        has_calculated_cost: bool | None = None,
+        name_query: str | None = None,
+        batch_size: int = 1000,
+    ) -> AsyncIterator[tuple]:
+        index = self.store.owners.get(owner_session_id)
+        if index is None:
+            return
+        for package in index.filtered(type_id, has_calculated_cost, name_query):
+            yield tuple(
+                getattr(package, PACKAGE_FIELD_COLUMNS.get(name, name))
+                for name in columns
+            )
+
+    async def increment_package_stats(
+        self,
+        owner_session_id: str,
+        type_id: UUID | None,
+        package_count: int = 0,
+        total_weight_kg: Decimal = Decimal("0"),
+        total_contents_value_usd: Decimal = Decimal("0"),
+        calculated_count: int = 0,
+        total_delivery_cost_rub: Decimal = Decimal("0"),
+    ) -> None:
+        row = self.store.stats.setdefault(
+            (owner_session_id, type_id),
+            [0, Decimal("0"), Decimal("0"), 0, Decimal("0")],
+        )
+        deltas = (
+            package_count,
+            total_weight_kg,
+            total_contents_value_usd,
+            calculated_count,
+            total_delivery_cost_rub,
+        )
+        for position, delta in enumerate(deltas):
+            row[position] += delta
+
+    async def get_package_stats(self, owner_session_id: str) -> list[PackageStatsRow]:
+        rows = []
+        for (owner, type_id), values in self.store.stats.items():
+            if owner != owner_session_id or values[0] <= 0:
+                continue
+            package_type = self.store.package_types.get(type_id)
+            rows.append(
+                PackageStatsRow(
+                    type_id, package_type.name if package_type else None, *values
+                )
+            )
+        return sorted(rows, key=lambda row: row.package_count, reverse=True)
+
+
+class HotPackageCache:
+    """LRU of ``OwnerPackageIndex`` for the largest sessions.
+
+    Indexes are built from ``loader`` in a background task, never on the request
+    path: until a session is loaded its list requests go to the database. An
+    entry older than ``ttl`` is still served while it is reloaded, so prices set
+    by the worker (another process) show up within ``ttl`` plus one load.
+    Packages created by this process are added to the cached index in place;
+    the cache is not shared, so packages created by other API processes show up
+    only after the next reload, like prices.
+    """
+
+    def __init__(
+        self,
+        max_owners: int,
+        ttl: float,
+        loader: Callable[[str], Awaitable[list[PackageRow]]],
+    ):
+        self.max_owners = max_owners
+        self.ttl = ttl
+        self.loader = loader
+        self._entries: OrderedDict[str, tuple[float, OwnerPackageIndex]] = OrderedDict()
+        self._loading: dict[str, asyncio.Task] = {}
+        # Packages created while the session is being loaded, which the load
+        # may or may not have seen.
+        self._created_while_loading: dict[str, list[PackageRow]] = {}
+
+    def get(self, owner_session_id: str) -> OwnerPackageIndex | None:
+        entry = self._entries.get(owner_session_id)
+        if entry is None:
+            return None
+        expires_at, index = entry
+        if time.monotonic() >= expires_at:
+            self.load(owner_session_id)
+        self._entries.move_to_end(owner_session_id)
+        return index
+
+    def is_hot(self, owner_session_id: str) -> bool:
+        return owner_session_id in self._entries or owner_session_id in self._loading
+
+    def load(self, owner_session_id: str) -> None:
+        """Start (re)building the session's index unless a load is running."""
+        if owner_session_id in self._loading:
+            return
+        self._created_while_loading[owner_session_id] = []
+        self._loading[owner_session_id] = asyncio.create_task(
+            self._load(owner_session_id)
+        )
+
+    async def _load(self, owner_session_id: str) -> None:
+        try:
+            rows = await self.loader(owner_session_id)
+        except Exception as e:
+            logger.warning(
+                "Failed to load hot cache of session %s: %s", owner_session_id, e
+            )
+            self._entries.pop(owner_session_id, None)
+            return
+        finally:
+            del self._loading[owner_session_id]
+            created = self._created_while_loading.pop(owner_session_id)
+
+        index = OwnerPackageIndex(rows)
+        for row in created:
+            if row.id not in index.by_id:
+                index.add(row)
+        self.put(owner_session_id, index)
+
+    def put(self, owner_session_id: str, index: OwnerPackageIndex) -> None:
+        self._entries[owner_session_id] = (time.monotonic() + self.ttl, index)
+        self._entries.move_to_end(owner_session_id)
+        while len(self._entries) > self.max_owners:
+            self._entries.popitem(last=False)
+
+    def add(self, row: PackageRow) -> None:
+        """Record a committed new package of a cached or loading session."""
+        entry = self._entries.get(row.owner_session_id)
+        if entry is not None:
+            entry[1].add(row)
+        created = self._created_while_loading.get(row.owner_session_id)
+        if created is not None:
+            created.append(row)
+
+    def invalidate(self, owner_session_id: str) -> None:
+        self._entries.pop(owner_session_id, None)
+
+
+class CachedPackageRepository(PackageRepository):
+    """Read-through hot cache in front of another repository (``HOT_CACHE_*``).
+
+    Only the package list is served from memory, and only for sessions with at
+    least ``min_packages`` packages: the first list request that reports such a
+    total starts loading the session in the background (see ``HotPackageCache``).
+    Packages created in a ``transaction()`` are added to the cached index once
+    it commits.
+    """
+
+    def __init__(
+        self, source: PackageRepository, cache: HotPackageCache, min_packages: int
+    ):
+        self.source = source
+        self.cache = cache
+        self.min_packages = min_packages
+        self._created: list[PackageRow] = []
+
+    @contextlib.asynccontextmanager
+    async def transaction(self) -> AsyncIterator[None]:
+        self._created = []
+        async with self.source.transaction():
+            yield
+        for row in self._created:
+            self.cache.add(row)
+        self._created = []
+
+    async def create_package(
+        self,
+        name: str,
+        weight_kg: Decimal,
+        type_id: UUID,
+        contents_value: Decimal,
+        owner_session_id: str,
+        contents_currency: str = "USD",
+    ) -> Package:
+        package = await self.source.create_package(
+            name=name,
+            weight_kg=weight_kg,
+            type_id=type_id,
+            contents_value=contents_value,
+            owner_session_id=owner_session_id,
+            contents_currency=contents_currency,
+        )
+        if self.cache.is_hot(owner_session_id):
+            self._created.append(
+                PackageRow(
+                    id=package.id,
+                    name=name,
+                    weight_kg=weight_kg,
+                    type_id=type_id,
+                    contents_value=contents_value,
+                    contents_currency=contents_currency,
+                    delivery_cost_rub=None,
+                    owner_session_id=owner_session_id,
+                    package_type=await self._package_type_row(type_id),
+                )
+            )
+        return package
+
+    async def _package_type_row(self, type_id: UUID | None) -> PackageTypeRow | None:
+        if type_id is None:
+            return None
+        # The types list does not load the packages of a type, unlike a lookup
+        # of a single ``PackageType`` by id.
+        for item in await self.source.get_all_types_packages():
+            if item.id == type_id:
+                return PackageTypeRow(item.id, item.name, item.description)
+        return None
+
+    async def get_user_packages_with_pagination(
+        self,
+        owner_session_id: str,
+        type_id: UUID | None = None,
+        has_calculated_cost: bool | None = None,
+        name_query: str | None = None,
+        skip: int = 0,
+        limit: int = 100,
+        fields: Sequence[str] | None = None,
+    ) -> tuple[list[Package], int]:
+        index = self.cache.get(owner_session_id)
+        if index is not None:
+            return index.page(type_id, has_calculated_cost, name_query, skip, limit)
+
+        packages, total = await self.source.get_user_packages_with_pagination(
+            owner_session_id=owner_session_id,
+            type_id=type_id,
+            has_calculated_cost=has_calculated_cost,
+            name_query=name_query,
+            skip=skip,
+            limit=limit,
+            fields=fields,
+        )
+        if total >= self.min_packages:
+            self.cache.load(owner_session_id)
+        return packages, total
+
+    async def get_all_types_packages(self) -> list[PackageType]:
+        return await self.source.get_all_types_packages()
+
+    async def get_package_type_by_id(self, type_id: UUID) -> PackageType | None:
+        return await self.source.get_package_type_by_id(type_id)
+
+    async def get_package_by_id(
+        self,
+        package_id: UUID,
+        owner_session_id: str,
+        fields: Sequence[str] | None = None,
+    ) -> Package | None:
+        return await self.source.get_package_by_id(
+            package_id, owner_session_id, fields=fields
+        )
+
+    async def get_packages_by_ids(
+        self, package_ids: Sequence[UUID], owner_session_id: str
+    ) -> list[Package]:
+        return await self.source.get_packages_by_ids(package_ids, owner_session_id)
+
+    async def suggest_packages(
+        self, owner_session_id: str, name_query: str, limit: int = 10
+    ) -> list:
+        return await self.source.suggest_packages(owner_session_id, name_query, limit)
+
+    async def get_user_packages(self, owner_session_id: str) -> list[Package]:
+        return await self.source.get_user_packages(owner_session_id)
+
+    def stream_user_packages(
+        self,
+        owner_session_id: str,
+        columns: Sequence[str],
+        type_id: UUID | None = None,
+        has_calculated_cost: bool | None = None,
+        name_query: str | None = None,
+        batch_size: int = 1000,
+    ) -> AsyncIterator[tuple]:
+        return self.source.stream_user_packages(
+            owner_session_id,
+            columns,
+            type_id=type_id,
+            has_calculated_cost=has_calculated_cost,
+            name_query=name_query,
+            batch_size=batch_size,
+        )
+
+    async def increment_package_stats(
+        self,
+        owner_session_id: str,
+        type_id: UUID | None,
+        package_count: int = 0,
+        total_weight_kg: Decimal = Decimal("0"),
+        total_contents_value_usd: Decimal = Decimal("0"),
+        calculated_count: int = 0,
+        total_delivery_cost_rub: Decimal = Decimal("0"),
+    ) -> None:
+        await self.source.increment_package_stats(
+            owner_session_id=owner_session_id,
+            type_id=type_id,
+            package_count=package_count,
+            total_weight_kg=total_weight_kg,
+            total_contents_value_usd=total_contents_value_usd,
+            calculated_count=calculated_count,
+            total_delivery_cost_rub=total_delivery_cost_rub,
+        )
+
+    async def get_package_stats(self, owner_session_id: str) -> list:
+        return await self.source.get_package_stats(owner_session_id)
@@ -0,0 +1,138 @@
+from sqlalchemy import delete, text
+from sqlalchemy.ext.asyncio import AsyncSession
+from src.data.models.models import PackageStats
+from src.utils.tracing import traced_methods
+
+# Loose index scan over ix_packages_owner_session_id: one index probe per
+# distinct owner instead of reading every row like SELECT DISTINCT would.
+OWNERS_AFTER_QUERY = text(
+    """
+    WITH RECURSIVE owners AS (
+        (
+            SELECT owner_session_id FROM packages
+            WHERE owner_session_id > :after
+            ORDER BY owner_session_id
+            LIMIT 1
+        )
+        UNION ALL
+        SELECT (
+            SELECT p.owner_session_id FROM packages p
+            WHERE p.owner_session_id > owners.owner_session_id
+            ORDER BY p.owner_session_id
+            LIMIT 1
+        )
+        FROM owners
+        WHERE owners.owner_session_id IS NOT NULL
+    )
+    SELECT owner_session_id FROM owners
+    WHERE owner_session_id IS NOT NULL
+    LIMIT :limit
+    """
+)
+
+OWNER_HAS_PACKAGES_QUERY = text(
+    "SELECT EXISTS (SELECT 1 FROM packages WHERE owner_session_id = :owner)"
+)
+
+MEASURE_OWNER_QUERY = text(
+    """
+    SELECT count(*), coalesce(sum(pg_column_size(p.*)), 0)
+    FROM packages p
+    WHERE p.owner_session_id = :owner
+    """
+)
+
+DELETE_OWNER_BATCH_QUERY = text(
+    """
+    WITH doomed AS (
+        SELECT id FROM packages
+        WHERE owner_session_id = :owner
+        LIMIT :limit
+        FOR UPDATE SKIP LOCKED
+    ),
+    removed AS (
+        DELETE FROM packages p USING doomed
+        WHERE p.id = doomed.id AND p.owner_session_id = :owner
+        RETURNING p.*
+    )
+    SELECT count(*), coalesce(sum(pg_column_size(removed.*)), 0) FROM removed
+    """
+)
+
+ARCHIVE_OWNER_BATCH_QUERY = text(
+    """
+    WITH doomed AS (
+        SELECT id FROM packages
+        WHERE owner_session_id = :owner
+        LIMIT :limit
+        FOR UPDATE SKIP LOCKED
+    ),
+    removed AS (
+        DELETE FROM packages p USING doomed
+        WHERE p.id = doomed.id AND p.owner_session_id = :owner
+        RETURNING p.*
+    ),
+    archived AS (
+        INSERT INTO packages_archive (
+            id, name, weight_kg, type_id, contents_value, contents_currency,
+            delivery_cost_rub, priced_contents_value_usd, owner_session_id
+        )
+        SELECT
+            id, name, weight_kg, type_id, contents_value, contents_currency,
+            delivery_cost_rub, priced_contents_value_usd, owner_session_id
+        FROM removed
+        ON CONFLICT (id) DO NOTHING
+    )
+    SELECT count(*), coalesce(sum(pg_column_size(removed.*)), 0) FROM removed
+    """
+)
+
+
+@traced_methods("dal.retention")
+class RetentionDAL:
+    """Data access for the session retention job (see ``src.tasks.retention``)."""
+
+    def __init__(self, db_session: AsyncSession):
+        self.db_session = db_session
+
+    async def get_owner_ids_after(self, after: str, limit: int) -> list[str]:
+        result = await self.db_session.execute(
+            OWNERS_AFTER_QUERY, {"after": after, "limit": limit}
+        )
+        return result.scalars().all()
+
+    async def measure_owner_packages(self, owner_session_id: str) -> tuple[int, int]:
+        """Row count and approximate tuple bytes of the owner's packages."""
+        result = await self.db_session.execute(
+            MEASURE_OWNER_QUERY, {"owner": owner_session_id}
+        )
+        rows, size = result.one()
+        return rows, size
+
+    async def owner_has_packages(self, owner_session_id: str) -> bool:
+        result = await self.db_session.execute(
+            OWNER_HAS_PACKAGES_QUERY, {"owner": owner_session_id}
+        )
+        return result.scalar_one()
+
+    async def remove_owner_packages_batch(
+        self, owner_session_id: str, limit: int, archive: bool = False
+    ) -> tuple[int, int]:
+        """Delete (or move to ``packages_archive``) up to ``limit`` packages.
+
+        Rows locked by live transactions are skipped and picked up by the next
+        batch. Returns the number of rows removed and their approximate bytes.
+        """
+        query = ARCHIVE_OWNER_BATCH_QUERY if archive else DELETE_OWNER_BATCH_QUERY
+        result = await self.db_session.execute(
+            query, {"owner": owner_session_id, "limit": limit}
+        )
+        rows, size = result.one()
+        return rows, size
+
+    async def delete_owner_stats(self, owner_session_id: str) -> None:
+        await self.db_session.execute(
+            delete(PackageStats).where(
+                PackageStats.owner_session_id == owner_session_id
+            )
+        )
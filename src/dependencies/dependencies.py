@@ -1,7 +1,21 @@
-from fastapi import Header, HTTPException
+from fastapi import Header, HTTPException, Request
+from src.middleware.session_middleware import (
+    SESSION_REFRESH_SECONDS,
+    SESSION_TTL_SECONDS,
+)
 
 
-async def get_session_id(session_id: str = Header(..., alias="session-id")) -> str:
+async def get_session_id(
+    request: Request, session_id: str = Header(..., alias="session-id")
+) -> str:
     if not session_id:
         raise HTTPException(status_code=400, detail="Session ID header is required")
+    # Packages are owned by this id, so keep its session key alive: the
+    # retention job treats owners without a key as expired. A TTL read is
+    # cheaper than a write, so the key is only rewritten when it is missing
+    # (TTL -2) or due for a refresh.
+    redis = request.app.state.redis
+    key = f"session:{session_id}"
+    if await redis.ttl(key) < SESSION_TTL_SECONDS - SESSION_REFRESH_SECONDS:
+        await redis.set(key, "active", ex=SESSION_TTL_SECONDS)
     return session_id
@@ -1,4 +1,3 @@
-import uvicorn
 from fastapi import FastAPI
 from contextlib import asynccontextmanager
 from fastapi.routing import APIRouter
@@ -6,18 +5,25 @@ from src.settings import settings
 from src.services.ping_service import service_router
 from src.api.handlers import router
 from src.redis_client import get_redis_client
+from src.data.db.session import engine
+from src.services.warmup_service import _warm_up
 from middleware.session_middleware import SessionMiddleware
+from middleware.profiling_middleware import ProfilingMiddleware
+from middleware.tracing_middleware import TracingMiddleware
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     redis_client = await get_redis_client()
     app.state.redis = redis_client
+    if settings.WARMUP_ENABLED:
+        await _warm_up(redis_client)
 
     yield
 
     if redis_client:
         await redis_client.close()
+    await engine.dispose()
 
 
 app = FastAPI(
@@ -27,6 +33,9 @@ app = FastAPI(
 )
 
 app.add_middleware(SessionMiddleware)
+app.add_middleware(ProfilingMiddleware)
+if settings.TRACING_ENABLED:
+    app.add_middleware(TracingMiddleware)
 
 main_api_router = APIRouter()
 main_api_router.include_router(
@@ -36,4 +45,6 @@ main_api_router.include_router(service_router, tags=["service"])
 app.include_router(main_api_router)
 
 if __name__ == "__main__":
+    import uvicorn
+
     uvicorn.run(app, host=settings.APP_HOST, port=settings.APP_PORT)
@@ -0,0 +1,57 @@
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from src.settings import settings
+from src.utils.logger import logger
+from src.utils.profiling import (
+    Profiler,
+    new_profile_id,
+    save_profile,
+    verify_profile_header,
+)
+
+PROFILE_HEADER = "x-profile"
+PROFILE_ID_HEADER = "X-Profile-Id"
+
+
+class ProfilingMiddleware:
+    """Profile a single request on demand (see ``src.utils.profiling``).
+
+    Enabled by an ``X-Profile`` header: any value when ``DEBUG`` is on, otherwise
+    a value signed with ``SECRET_KEY`` for the request path. The profile is saved
+    to Redis and its id returned in ``X-Profile-Id``. Plain ASGI, so requests
+    without the header pass straight through.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        header = Headers(scope=scope).get(PROFILE_HEADER)
+        if header is None or not (
+            settings.DEBUG or verify_profile_header(header, scope["path"])
+        ):
+            await self.app(scope, receive, send)
+            return
+
+        profile_id = new_profile_id()
+
+        async def send_with_profile_id(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                MutableHeaders(scope=message)[PROFILE_ID_HEADER] = profile_id
+            await send(message)
+
+        profiler = Profiler(f"{scope['method']} {scope['path']}")
+        with profiler:
+            await self.app(scope, receive, send_with_profile_id)
+
+        try:
+            await save_profile(scope["app"].state.redis, profile_id, profiler.result())
+        except Exception as e:
+            logger.warning("Failed to save profile %s: %s", profile_id, e)
+        else:
+            logger.info("Saved profile %s of %s", profile_id, profiler.label)
@@ -4,6 +4,9 @@ from starlette.requests import Request
 
 SESSION_COOKIE_NAME = "session_id"
 SESSION_TTL_SECONDS = 30 * 24 * 3600
+# Header sessions rewrite their key only once it is this much past its last
+# refresh (see get_session_id), not on every request.
+SESSION_REFRESH_SECONDS = 24 * 3600
 
 
 class SessionMiddleware(BaseHTTPMiddleware):
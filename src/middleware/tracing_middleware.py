@@ -0,0 +1,56 @@
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from src.utils.tracing import span
+
+TRACE_ID_HEADER = "X-Trace-Id"
+
+
+def _parse_traceparent(value: str | None) -> tuple[str | None, str | None]:
+    """``(trace_id, parent_id)`` from a W3C ``traceparent`` header, if valid."""
+    if not value:
+        return None, None
+    parts = value.split("-")
+    if len(parts) != 4 or len(parts[1]) != 32 or len(parts[2]) != 16:
+        return None, None
+    return parts[1], parts[2]
+
+
+class TracingMiddleware:
+    """Root span per HTTP request (see ``src.utils.tracing``).
+
+    Continues the caller's trace from ``traceparent`` and returns the trace id
+    in ``X-Trace-Id``. Not installed while tracing is disabled.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        trace_id, parent_id = _parse_traceparent(
+            Headers(scope=scope).get("traceparent")
+        )
+        with span(
+            f"http {scope['method']}",
+            trace_id=trace_id,
+            parent_id=parent_id,
+            path=scope["path"],
+        ) as request_span:
+
+            async def send_with_trace_id(message: Message) -> None:
+                if message["type"] == "http.response.start":
+                    MutableHeaders(scope=message)[TRACE_ID_HEADER] = (
+                        request_span.trace_id
+                    )
+                    request_span.set(status_code=message["status"])
+                await send(message)
+
+            await self.app(scope, receive, send_with_trace_id)
+
+            route = scope.get("route")
+            if route is not None:
+                request_span.name = f"http {scope['method']} {route.path}"
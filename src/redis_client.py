@@ -1,9 +1,31 @@
 import redis.asyncio as redis
+from redis.asyncio.client import Pipeline
 from src.settings import settings
+from src.utils.tracing import span
+
+
+class TracedPipeline(Pipeline):
+    async def execute(self, raise_on_error: bool = True):
+        with span("redis.pipeline", commands=len(self.command_stack)):
+            return await super().execute(raise_on_error)
+
+
+class TracedRedis(redis.Redis):
+    """Client with a span per command (used while TRACING_ENABLED is on)."""
+
+    async def execute_command(self, *args, **options):
+        with span(f"redis.{args[0]}"):
+            return await super().execute_command(*args, **options)
+
+    def pipeline(self, transaction: bool = True, shard_hint: str | None = None):
+        return TracedPipeline(
+            self.connection_pool, self.response_callbacks, transaction, shard_hint
+        )
 
 
 async def get_redis_client():
-    redis_client = redis.Redis(
+    client_class = TracedRedis if settings.TRACING_ENABLED else redis.Redis
+    redis_client = client_class(
         host=settings.REDIS_HOST,
         port=settings.REDIS_PORT,
         password=settings.REDIS_PASSWORD,
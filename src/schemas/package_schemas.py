@@ -1,14 +1,52 @@
-from pydantic import BaseModel, field_validator
+from pydantic import AliasChoices, BaseModel, Field, field_validator, model_validator
 import uuid
 from decimal import Decimal
 from .package_type import PackageTypeBase
 
+MAX_LOOKUP_IDS = 500
+MAX_QUOTE_ITEMS = 1000
+# Cap on the declared contents value, applied to its USD equivalent.
+MAX_CONTENTS_VALUE_USD = Decimal("1000000")
+CONTENTS_VALUE_LIMIT_ERROR = "Стоимость содержимого не может превышать 1,000,000 USD"
+# ``contents_value`` was called ``contents_value_usd`` before any CBR currency
+# could be declared; the old name is still accepted on input and returned, with
+# the same amount, next to ``contents_value`` and ``contents_currency``.
+CONTENTS_VALUE_ALIASES = AliasChoices("contents_value", "contents_value_usd")
+
+
+def _validate_weight(v: Decimal) -> Decimal:
+    if v <= 0:
+        raise ValueError("Вес должен быть положительным")
+    if v > 1000:
+        raise ValueError("Вес не может превышать 1000 кг")
+    return v
+
+
+def _validate_contents_value(v: Decimal) -> Decimal:
+    if v <= 0:
+        raise ValueError("Стоимость должна быть положительной")
+    return v
+
+
+def _validate_usd_contents_value(value: Decimal, currency: str) -> None:
+    # Other currencies need a rate table, they are checked by the services.
+    if currency == "USD" and value > MAX_CONTENTS_VALUE_USD:
+        raise ValueError(CONTENTS_VALUE_LIMIT_ERROR)
+
+
+def _validate_currency_code(v: str) -> str:
+    v = v.strip().upper()
+    if len(v) != 3 or not v.isalpha():
+        raise ValueError("Код валюты должен состоять из трёх латинских букв")
+    return v
+
 
 class PackageCreate(BaseModel):
     name: str
     weight_kg: Decimal
     type_id: uuid.UUID = None
-    contents_value_usd: Decimal
+    contents_value: Decimal = Field(validation_alias=CONTENTS_VALUE_ALIASES)
+    contents_currency: str = "USD"
 
     @field_validator("name")
     def name_not_empty(cls, v):
@@ -18,19 +56,20 @@ class PackageCreate(BaseModel):
 
     @field_validator("weight_kg")
     def weight_reasonable(cls, v):
-        if v <= 0:
-            raise ValueError("Вес должен быть положительным")
-        if v > 1000:
-            raise ValueError("Вес не может превышать 1000 кг")
-        return v
+        return _validate_weight(v)
 
-    @field_validator("contents_value_usd")
+    @field_validator("contents_value")
     def value_reasonable(cls, v):
-        if v <= 0:
-            raise ValueError("Стоимость должна быть положительной")
-        if v > 1000000:
-            raise ValueError("Стоимость не может превышать 1,000,000 USD")
-        return v
+        return _validate_contents_value(v)
+
+    @field_validator("contents_currency")
+    def currency_code(cls, v):
+        return _validate_currency_code(v)
+
+    @model_validator(mode="after")
+    def usd_value_limit(self):
+        _validate_usd_contents_value(self.contents_value, self.contents_currency)
+        return self
 
 
 class PackageCreateResponse(BaseModel):
@@ -38,7 +77,9 @@ class PackageCreateResponse(BaseModel):
     name: str
     weight_kg: Decimal
     type_id: uuid.UUID | None = None
-    contents_value_usd: Decimal
+    contents_value_usd: Decimal = Field(validation_alias="contents_value")
+    contents_value: Decimal
+    contents_currency: str = "USD"
 
     class Config:
         from_attributes = True
@@ -49,6 +90,8 @@ class PackageResponse(BaseModel):
     name: str
     weight_kg: Decimal
     contents_value_usd: Decimal
+    contents_value: Decimal
+    contents_currency: str = "USD"
     delivery_cost_rub: Decimal | str | None = None
     package_type: PackageTypeBase | None = None
 
@@ -71,3 +114,82 @@ class PackageListResponse(BaseModel):
 
     class Config:
         from_attributes = True
+
+
+class PackageLookupRequest(BaseModel):
+    ids: list[uuid.UUID]
+
+    @field_validator("ids")
+    def ids_limit(cls, v):
+        if not v:
+            raise ValueError("Список идентификаторов не может быть пустым")
+        v = list(dict.fromkeys(v))
+        if len(v) > MAX_LOOKUP_IDS:
+            raise ValueError(
+                f"Нельзя запросить больше {MAX_LOOKUP_IDS} посылок за один раз"
+            )
+        return v
+
+
+class PackageLookupResponse(BaseModel):
+    packages: list[PackageResponse]
+    missing_ids: list[uuid.UUID]
+
+
+class PackageSuggestion(BaseModel):
+    id: uuid.UUID
+    name: str
+
+
+class PackageSuggestResponse(BaseModel):
+    suggestions: list[PackageSuggestion]
+
+
+class QuoteItem(BaseModel):
+    weight_kg: Decimal
+    contents_value: Decimal = Field(validation_alias=CONTENTS_VALUE_ALIASES)
+    contents_currency: str = "USD"
+
+    @field_validator("weight_kg")
+    def weight_reasonable(cls, v):
+        return _validate_weight(v)
+
+    @field_validator("contents_value")
+    def value_reasonable(cls, v):
+        return _validate_contents_value(v)
+
+    @field_validator("contents_currency")
+    def currency_code(cls, v):
+        return _validate_currency_code(v)
+
+    @model_validator(mode="after")
+    def usd_value_limit(self):
+        _validate_usd_contents_value(self.contents_value, self.contents_currency)
+        return self
+
+
+class QuoteRequest(BaseModel):
+    items: list[QuoteItem]
+
+    @field_validator("items")
+    def items_limit(cls, v):
+        if not v:
+            raise ValueError("Список посылок не может быть пустым")
+        if len(v) > MAX_QUOTE_ITEMS:
+            raise ValueError(
+                f"Нельзя рассчитать больше {MAX_QUOTE_ITEMS} посылок за один раз"
+            )
+        return v
+
+
+class QuoteResult(BaseModel):
+    weight_kg: Decimal
+    contents_value_usd: Decimal
+    contents_value: Decimal
+    contents_currency: str
+    delivery_cost_rub: Decimal | None = None
+    error: str | None = None
+
+
+class QuoteResponse(BaseModel):
+    items: list[QuoteResult]
@@ -0,0 +1,20 @@
+from pydantic import BaseModel
+import uuid
+from decimal import Decimal
+
+
+class PackageStatsItem(BaseModel):
+    type_id: uuid.UUID | None = None
+    type_name: str | None = None
+    package_count: int
+    total_weight_kg: Decimal
+    total_contents_value_usd: Decimal
+    calculated_count: int
+    pending_count: int
+    total_delivery_cost_rub: Decimal
+    avg_delivery_cost_rub: Decimal | None = None
+
+
+class PackageStatsResponse(BaseModel):
+    totals: PackageStatsItem
+    by_type: list[PackageStatsItem]
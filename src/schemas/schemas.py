@@ -1,10 +1,61 @@
+from enum import Enum
 from pydantic import BaseModel, field_validator
 from uuid import UUID
 
 
+EXPORT_FIELDS = (
+    "id",
+    "name",
+    "weight_kg",
+    "type_id",
+    "contents_value_usd",
+    "contents_value",
+    "contents_currency",
+    "delivery_cost_rub",
+)
+
+MAX_NAME_QUERY_LENGTH = 100
+
+PACKAGE_FIELDS = (
+    "id",
+    "name",
+    "weight_kg",
+    "contents_value_usd",
+    "contents_value",
+    "contents_currency",
+    "delivery_cost_rub",
+    "package_type",
+)
+
+
+def _parse_fields(value, allowed: tuple[str, ...]) -> list[str]:
+    if isinstance(value, str):
+        value = [item.strip() for item in value.split(",") if item.strip()]
+    if not value:
+        raise ValueError("At least one field must be selected")
+    unknown = [item for item in value if item not in allowed]
+    if unknown:
+        raise ValueError(
+            f"Unknown fields: {', '.join(unknown)}. Allowed: {', '.join(allowed)}"
+        )
+    return list(dict.fromkeys(value))
+
+
 class PackageFilter(BaseModel):
     type_id: UUID | None = None
     has_calculated_cost: bool | None = None
+    q: str | None = None
+
+    @field_validator("q")
+    def normalize_query(cls, value):
+        if value is None:
+            return None
+        value = value.strip()
+        if len(value) > MAX_NAME_QUERY_LENGTH:
+            raise ValueError(
+                f"The search query cannot exceed {MAX_NAME_QUERY_LENGTH} characters"
+            )
+        return value or None
 
 
 class PaginationParams(BaseModel):
@@ -16,3 +67,31 @@ class PaginationParams(BaseModel):
         if value > 100:
             raise ValueError("The page size cannot exceed 100")
         return value
+
+
+class ExportFormat(str, Enum):
+    NDJSON = "ndjson"
+    CSV = "csv"
+
+
+class PackageExportParams(BaseModel):
+    format: ExportFormat = ExportFormat.NDJSON
+    fields: list[str] = list(EXPORT_FIELDS)
+
+    @field_validator("fields", mode="before")
+    def validate_fields(cls, value):
+        if value is None:
+            return list(EXPORT_FIELDS)
+        return _parse_fields(value, EXPORT_FIELDS)
+
+
+class PackageFieldsParams(BaseModel):
+    """Sparse fieldset for package responses; ``None`` means all fields."""
+
+    fields: list[str] | None = None
+
+    @field_validator("fields", mode="before")
+    def validate_fields(cls, value):
+        if value is None:
+            return None
+        return _parse_fields(value, PACKAGE_FIELDS)
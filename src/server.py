@@ -0,0 +1,41 @@
+"""Production launcher: N uvicorn worker processes on uvloop/httptools.
+
+Every worker imports ``src.main:app`` itself and warms its own DB pool and
+caches in ``lifespan`` (see ``src.services.warmup_service``) before serving.
+
+Usage: ``python -m src.server`` (``WEB_WORKERS`` and the other ``WEB_*`` settings)
+"""
+
+import importlib.util
+import os
+
+import uvicorn
+
+from src.settings import settings
+
+
+def _installed(module: str) -> bool:
+    return importlib.util.find_spec(module) is not None
+
+
+def main() -> None:
+    workers = settings.WEB_WORKERS or os.cpu_count() or 1
+    uvicorn.run(
+        "src.main:app",
+        host=settings.APP_HOST,
+        port=settings.APP_PORT,
+        workers=workers,
+        loop="uvloop" if _installed("uvloop") else "asyncio",
+        http="httptools" if _installed("httptools") else "h11",
+        backlog=settings.WEB_BACKLOG,
+        timeout_keep_alive=settings.WEB_KEEPALIVE_SECONDS,
+        limit_concurrency=settings.WEB_LIMIT_CONCURRENCY,
+        access_log=settings.WEB_ACCESS_LOG,
+        # Keep the queued logging pipeline from src.utils.logger.
+        log_config=None,
+        proxy_headers=True,
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -1,23 +1,87 @@
 from src.schemas.package_schemas import (
+    CONTENTS_VALUE_LIMIT_ERROR,
+    MAX_CONTENTS_VALUE_USD,
     PackageCreate,
     PackageListResponse,
+    PackageLookupResponse,
+    PackageSuggestResponse,
+    PackageSuggestion,
     PackageResponse,
     PackageTypeBase,
 )
-from src.data.repositories.db_crud import UserDAL
+from src.data.repositories.factory import get_package_repository
 from src.data.models.models import Package
 from sqlalchemy.ext.asyncio import AsyncSession
+from decimal import Decimal
+from typing import AsyncIterator
 from uuid import UUID
+import csv
+import io
+import json
 from fastapi import HTTPException
-from src.schemas.schemas import PackageFilter, PaginationParams
+from src.schemas.schemas import (
+    ExportFormat,
+    PackageExportParams,
+    PackageFilter,
+    PaginationParams,
+)
+from src.utils.currency_utils import CurrencyService, RatesUnavailableError
+from src.utils.delivery_calculator import DeliveryCalculator
 from src.utils.logger import logger
+from src.utils.tracing import save_package_trace
+import redis.asyncio as redis
+
+EXPORT_CHUNK_SIZE = 64 * 1024
+SUGGEST_CACHE_TTL_SECONDS = 30
+# Latency budget for reading the shared rate table when validating a new
+# package; creation never waits for cbr-xml-daily.
+CREATE_RATES_TIMEOUT_SECONDS = 0.05
+
+
+async def _check_contents_value(body: PackageCreate, redis_client: redis.Redis) -> None:
+    """Reject an unknown currency or a value over the cap in its USD equivalent.
+
+    Only cached rates are used (the last known table if the current one has
+    expired), creation never waits for cbr-xml-daily. If no table was ever
+    loaded the value cannot be checked and the request is rejected with 503.
+    USD values are already checked by ``PackageCreate``.
+    """
+    if body.contents_currency == "USD":
+        return
+    try:
+        rates = await CurrencyService(redis_client).get_cached_rates(
+            CREATE_RATES_TIMEOUT_SECONDS
+        )
+    except RatesUnavailableError as e:
+        logger.warning(
+            "Package in %s rejected, rates unavailable: %s", body.contents_currency, e
+        )
+        raise HTTPException(
+            status_code=503,
+            detail="Currency rates are temporarily unavailable",
+            headers={"Retry-After": "5"},
+        )
+
+    value_usd = DeliveryCalculator.to_usd(
+        body.contents_value, body.contents_currency, rates
+    )
+    if value_usd is None:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Currency {body.contents_currency} is not supported",
+        )
+    if value_usd > MAX_CONTENTS_VALUE_USD:
+        raise HTTPException(status_code=422, detail=CONTENTS_VALUE_LIMIT_ERROR)
 
 
 async def _create_package(
-    body: PackageCreate, session_id: str, session_db: AsyncSession
+    body: PackageCreate,
+    session_id: str,
+    session_db: AsyncSession,
+    redis_client: redis.Redis | None = None,
 ) -> Package:
-    async with session_db.begin():
-        user_dal = UserDAL(session_db)
+    user_dal = get_package_repository(session_db)
+    async with user_dal.transaction():
         if body.type_id is not None:
             package_type = await user_dal.get_package_type_by_id(body.type_id)
 
@@ -31,18 +95,143 @@ async def _create_package(
             name=body.name,
             weight_kg=body.weight_kg,
             type_id=body.type_id,
-            contents_value_usd=body.contents_value_usd,
+            contents_value=body.contents_value,
+            contents_currency=body.contents_currency,
             owner_session_id=session_id,
         )
-        return new_package
+        await user_dal.increment_package_stats(
+            owner_session_id=session_id,
+            type_id=body.type_id,
+            package_count=1,
+            total_weight_kg=body.weight_kg,
+            # Non-USD values are converted and added when the parcel is priced.
+            total_contents_value_usd=body.contents_value
+            if body.contents_currency == "USD"
+            else Decimal("0"),
+        )
+
+    if redis_client is not None:
+        try:
+            await save_package_trace(redis_client, new_package.id)
+        except Exception as e:
+            logger.warning("Failed to save trace of package %s: %s", new_package.id, e)
+    return new_package
+
+
+def _package_type_data(package: Package) -> PackageTypeBase | None:
+    if not package.package_type:
+        return None
+    return PackageTypeBase(
+        id=package.package_type.id,
+        name=package.package_type.name,
+        description=package.package_type.description,
+    )
+
+
+def _format_delivery_cost(package: Package) -> str:
+    return (
+        f"{package.delivery_cost_rub} RUB"
+        if package.delivery_cost_rub
+        else "Не рассчитано"
+    )
+
+
+PACKAGE_FIELD_GETTERS = {
+    "id": lambda package: package.id,
+    "name": lambda package: package.name,
+    "weight_kg": lambda package: package.weight_kg,
+    "contents_value_usd": lambda package: package.contents_value,
+    "contents_value": lambda package: package.contents_value,
+    "contents_currency": lambda package: package.contents_currency,
+    "delivery_cost_rub": _format_delivery_cost,
+    "package_type": _package_type_data,
+}
+
+
+def _to_package_response(
+    package: Package, fields: list[str] | None = None
+) -> PackageResponse:
+    """Serialize a package; with ``fields`` only those attributes are touched.
+
+    A sparse response is built with ``model_construct`` so the omitted required
+    fields stay unset and can be dropped with ``exclude_unset`` on output.
+    """
+    if fields is None:
+        return PackageResponse(
+            **{name: getter(package) for name, getter in PACKAGE_FIELD_GETTERS.items()}
+        )
+    return PackageResponse.model_construct(
+        **{name: PACKAGE_FIELD_GETTERS[name](package) for name in fields}
+    )
 
 
 async def _get_package_by_id(
-    package_id: UUID, session_id: str, session_db: AsyncSession
-) -> Package | None:
-    user_dal = UserDAL(session_db)
-    requested_package = await user_dal.get_package_by_id(package_id, session_id)
-    return requested_package
+    package_id: UUID,
+    session_id: str,
+    session_db: AsyncSession,
+    fields: list[str] | None = None,
+) -> PackageResponse | None:
+    user_dal = get_package_repository(session_db)
+    requested_package = await user_dal.get_package_by_id(
+        package_id, session_id, fields=fields
+    )
+    if requested_package is None:
+        return None
+    return _to_package_response(requested_package, fields)
+
+
+async def _lookup_packages_by_ids(
+    package_ids: list[UUID], session_id: str, session_db: AsyncSession
+) -> PackageLookupResponse:
+    user_dal = get_package_repository(session_db)
+    found = {
+        package.id: package
+        for package in await user_dal.get_packages_by_ids(package_ids, session_id)
+    }
+    return PackageLookupResponse(
+        packages=[
+            _to_package_response(found[package_id])
+            for package_id in package_ids
+            if package_id in found
+        ],
+        missing_ids=[
+            package_id for package_id in package_ids if package_id not in found
+        ],
+    )
+
+
+async def _suggest_packages(
+    name_query: str,
+    limit: int,
+    session_id: str,
+    session_db: AsyncSession,
+    redis_client: redis.Redis | None = None,
+) -> PackageSuggestResponse:
+    cache_key = f"suggest:{session_id}:{limit}:{name_query.lower()}"
+
+    if redis_client is not None:
+        try:
+            cached = await redis_client.get(cache_key)
+            if cached:
+                return PackageSuggestResponse.model_validate_json(cached)
+        except Exception as e:
+            logger.warning("Suggest cache read failed: %s", e)
+
+    user_dal = get_package_repository(session_db)
+    rows = await user_dal.suggest_packages(session_id, name_query, limit)
+    response = PackageSuggestResponse(
+        suggestions=[PackageSuggestion(id=row.id, name=row.name) for row in rows]
+    )
+
+    if redis_client is not None:
+        try:
+            await redis_client.setex(
+                cache_key, SUGGEST_CACHE_TTL_SECONDS, response.model_dump_json()
+            )
+        except Exception as e:
+            logger.warning("Suggest cache write failed: %s", e)
+
+    return response
 
 
 async def _get_user_packages_with_filters(
@@ -50,28 +239,29 @@ async def _get_user_packages_with_filters(
     pagination: PaginationParams,
     session_id: str,
     session_db: AsyncSession,
+    fields: list[str] | None = None,
 ) -> PackageListResponse:
-    logger.info(f"Getting packages for session: {session_id}")
+    logger.info("Getting packages for session: %s", session_id)
 
     actual_page = pagination.page if pagination.page is not None else 1
     actual_page_size = pagination.page_size if pagination.page_size is not None else 10
 
     if actual_page < 1:
         actual_page = 1
-        logger.warning(f"Page corrected to {actual_page}")
+        logger.warning("Page corrected to %s", actual_page)
 
     if actual_page_size < 1:
         actual_page_size = 10
-        logger.warning(f"Page size corrected to {actual_page_size}")
+        logger.warning("Page size corrected to %s", actual_page_size)
     elif actual_page_size > 100:
         actual_page_size = 100
-        logger.warning(f"Page size limited to {actual_page_size}")
+        logger.warning("Page size limited to %s", actual_page_size)
 
-    logger.info(
-        f"Using pagination - page: {actual_page}, page_size: {actual_page_size}"
+    logger.debug(
+        "Using pagination - page: %s, page_size: %s", actual_page, actual_page_size
     )
 
-    user_dal = UserDAL(session_db)
+    user_dal = get_package_repository(session_db)
 
     skip = (actual_page - 1) * actual_page_size
 
@@ -80,11 +270,13 @@ async def _get_user_packages_with_filters(
             owner_session_id=session_id,
             type_id=filters.type_id,
             has_calculated_cost=filters.has_calculated_cost,
+            name_query=filters.q,
             skip=skip,
             limit=actual_page_size,
+            fields=fields,
         )
     except Exception as e:
-        logger.error(f"Error in database query: {e}")
+        logger.error("Error in database query: %s", e)
         raise
 
     total_pages = 0
@@ -96,28 +288,11 @@ async def _get_user_packages_with_filters(
     package_responses = []
     for package in packages:
         try:
-            package_type_data = None
-            if package.package_type:
-                package_type_data = PackageTypeBase(
-                    id=package.package_type.id,
-                    name=package.package_type.name,
-                    description=package.package_type.description,
-                )
-
-            package_response = PackageResponse(
-                id=package.id,
-                name=package.name,
-                weight_kg=package.weight_kg,
-                contents_value_usd=package.contents_value_usd,
-                delivery_cost_rub=f"{package.delivery_cost_rub} RUB"
-                if package.delivery_cost_rub
-                else "Не рассчитано",
-                package_type=package_type_data,
-            )
+            package_response = _to_package_response(package, fields)
             package_responses.append(package_response)
         except Exception as e:
             logger.error(
-                f"Error creating PackageResponse for package {package.id}: {e}"
+                "Error creating PackageResponse for package %s: %s", package.id, e
             )
             continue
 
@@ -130,3 +305,54 @@ async def _get_user_packages_with_filters(
         has_next=actual_page < total_pages,
         has_prev=actual_page > 1,
     )
+
+
+async def _export_user_packages(
+    filters: PackageFilter,
+    params: PackageExportParams,
+    session_id: str,
+    session_db: AsyncSession,
+) -> AsyncIterator[bytes]:
+    """Encode the user's packages as NDJSON/CSV chunks straight from a DB cursor."""
+    user_dal = get_package_repository(session_db)
+    rows = user_dal.stream_user_packages(
+        owner_session_id=session_id,
+        columns=params.fields,
+        type_id=filters.type_id,
+        has_calculated_cost=filters.has_calculated_cost,
+        name_query=filters.q,
+    )
+
+    buffer = io.StringIO()
+    if params.format == ExportFormat.CSV:
+        writer = csv.writer(buffer)
+        writer.writerow(params.fields)
+
+        def write_row(row) -> None:
+            writer.writerow(["" if value is None else value for value in row])
+
+    else:
+
+        def write_row(row) -> None:
+            buffer.write(
+                json.dumps(
+                    dict(zip(params.fields, row)),
+                    default=str,
+                    ensure_ascii=False,
+                )
+            )
+            buffer.write("\n")
+
+    exported = 0
+    async for row in rows:
+        write_row(row)
+        exported += 1
+        if buffer.tell() >= EXPORT_CHUNK_SIZE:
+            yield buffer.getvalue().encode()
+            buffer.seek(0)
+            buffer.truncate()
+
+    if buffer.tell():
+        yield buffer.getvalue().encode()
+
+    logger.info("Exported %s packages for session: %s", exported, session_id)
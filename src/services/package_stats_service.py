@@ -0,0 +1,66 @@
+from decimal import Decimal
+from sqlalchemy.ext.asyncio import AsyncSession
+from src.data.repositories.factory import get_package_repository
+from src.schemas.package_stats import PackageStatsItem, PackageStatsResponse
+
+
+def _build_stats_item(
+    package_count: int,
+    total_weight_kg: Decimal,
+    total_contents_value_usd: Decimal,
+    calculated_count: int,
+    total_delivery_cost_rub: Decimal,
+    type_id=None,
+    type_name: str | None = None,
+) -> PackageStatsItem:
+    avg_delivery_cost_rub = None
+    if calculated_count:
+        avg_delivery_cost_rub = (
+            Decimal(total_delivery_cost_rub) / calculated_count
+        ).quantize(Decimal("0.01"))
+
+    return PackageStatsItem(
+        type_id=type_id,
+        type_name=type_name,
+        package_count=package_count,
+        total_weight_kg=total_weight_kg,
+        total_contents_value_usd=total_contents_value_usd,
+        calculated_count=calculated_count,
+        pending_count=package_count - calculated_count,
+        total_delivery_cost_rub=total_delivery_cost_rub,
+        avg_delivery_cost_rub=avg_delivery_cost_rub,
+    )
+
+
+async def _get_package_stats(
+    session_id: str, session_db: AsyncSession
+) -> PackageStatsResponse:
+    user_dal = get_package_repository(session_db)
+    rows = await user_dal.get_package_stats(session_id)
+
+    by_type = [
+        _build_stats_item(
+            package_count=row.package_count,
+            total_weight_kg=row.total_weight_kg,
+            total_contents_value_usd=row.total_contents_value_usd,
+            calculated_count=row.calculated_count,
+            total_delivery_cost_rub=row.total_delivery_cost_rub,
+            type_id=row.type_id,
+            type_name=row.type_name,
+        )
+        for row in rows
+    ]
+
+    totals = _build_stats_item(
+        package_count=sum(item.package_count for item in by_type),
+        total_weight_kg=sum((item.total_weight_kg for item in by_type), Decimal("0")),
+        total_contents_value_usd=sum(
+            (item.total_contents_value_usd for item in by_type), Decimal("0")
+        ),
+        calculated_count=sum(item.calculated_count for item in by_type),
+        total_delivery_cost_rub=sum(
+            (item.total_delivery_cost_rub for item in by_type), Decimal("0")
+        ),
+    )
+
+    return PackageStatsResponse(totals=totals, by_type=by_type)
@@ -1,10 +1,32 @@
-from src.schemas.package_type import PackageTypeList
-from src.data.repositories.db_crud import UserDAL
+import time
+
+from src.schemas.package_type import PackageTypeBase
+from src.data.repositories.factory import get_package_repository
+from src.settings import settings
 from sqlalchemy.ext.asyncio import AsyncSession
 
+# Package types are reference data seeded by migrations, so every process keeps
+# its own copy for PACKAGE_TYPES_CACHE_TTL_SECONDS instead of querying each time.
+_package_types_cache: list[PackageTypeBase] | None = None
+_package_types_expires_at: float = 0.0
+
 
-async def _get_list_types_packages(session_db: AsyncSession) -> PackageTypeList:
-    async with session_db.begin():
-        user_dal = UserDAL(session_db)
+async def _get_list_types_packages(session_db: AsyncSession) -> list[PackageTypeBase]:
+    global _package_types_cache, _package_types_expires_at
+    if (
+        _package_types_cache is not None
+        and time.monotonic() < _package_types_expires_at
+    ):
+        return _package_types_cache
+
+    user_dal = get_package_repository(session_db)
+    async with user_dal.transaction():
         list_types_packages = await user_dal.get_all_types_packages()
-        return list_types_packages
+
+    _package_types_cache = [
+        PackageTypeBase.model_validate(item) for item in list_types_packages
+    ]
+    _package_types_expires_at = (
+        time.monotonic() + settings.PACKAGE_TYPES_CACHE_TTL_SECONDS
+    )
+    return _package_types_cache
@@ -0,0 +1,59 @@
+import redis.asyncio as redis
+from decimal import Decimal
+from src.schemas.package_schemas import (
+    CONTENTS_VALUE_LIMIT_ERROR,
+    MAX_CONTENTS_VALUE_USD,
+    QuoteItem,
+    QuoteRequest,
+    QuoteResponse,
+    QuoteResult,
+)
+from src.utils.currency_utils import CurrencyService
+from src.utils.delivery_calculator import DeliveryCalculator
+
+# Latency budget for reading the shared rate table from Redis; quotes never
+# wait for cbr-xml-daily.
+QUOTE_RATES_TIMEOUT_SECONDS = 0.05
+
+
+async def _quote_delivery(
+    body: QuoteRequest, redis_client: redis.Redis
+) -> QuoteResponse:
+    currency_service = CurrencyService(redis_client)
+    rates = await currency_service.get_cached_rates(QUOTE_RATES_TIMEOUT_SECONDS)
+
+    costs = DeliveryCalculator.price_parcels(
+        [
+            (item.weight_kg, item.contents_value, item.contents_currency)
+            for item in body.items
+        ],
+        rates,
+    )
+
+    results = []
+    for item, cost in zip(body.items, costs):
+        error = _quote_error(item, cost, rates)
+        results.append(
+            QuoteResult(
+                weight_kg=item.weight_kg,
+                contents_value_usd=item.contents_value,
+                contents_value=item.contents_value,
+                contents_currency=item.contents_currency,
+                delivery_cost_rub=cost if error is None else None,
+                error=error,
+            )
+        )
+    return QuoteResponse(items=results)
+
+
+def _quote_error(
+    item: QuoteItem, cost: Decimal | None, rates: dict[str, float]
+) -> str | None:
+    if cost is None:
+        return f"Currency {item.contents_currency} is not supported"
+    value_usd = DeliveryCalculator.to_usd(
+        item.contents_value, item.contents_currency, rates
+    )
+    if value_usd > MAX_CONTENTS_VALUE_USD:
+        return CONTENTS_VALUE_LIMIT_ERROR
+    return None
@@ -0,0 +1,51 @@
+import asyncio
+import time
+
+from sqlalchemy import text
+
+from src.data.db.session import async_session, engine
+from src.services.package_type_service import _get_list_types_packages
+from src.settings import settings
+from src.utils.currency_utils import CurrencyService
+from src.utils.logger import logger
+
+
+async def _warm_db_pool() -> None:
+    """Open ``DB_POOL_SIZE`` connections so first requests do not pay for connects."""
+
+    async def touch() -> None:
+        async with engine.connect() as conn:
+            await conn.execute(text("SELECT 1"))
+
+    await asyncio.gather(*(touch() for _ in range(settings.DB_POOL_SIZE)))
+
+
+async def _warm_package_types() -> None:
+    async with async_session() as session_db:
+        await _get_list_types_packages(session_db)
+
+
+async def _warm_up(redis_client) -> None:
+    """Fill per-process pools and caches before the worker starts serving.
+
+    Every step is bounded by ``WARMUP_TIMEOUT_SECONDS`` and failures are only
+    logged: a cold cache is slower, not broken, and must not block startup.
+    """
+    steps = {
+        "currency_rates": CurrencyService(redis_client).get_rates(),
+        "package_types": _warm_package_types(),
+    }
+    if settings.REPOSITORY_BACKEND == "postgres":
+        steps["db_pool"] = _warm_db_pool()
+    started = time.perf_counter()
+    results = await asyncio.gather(
+        *(
+            asyncio.wait_for(step, settings.WARMUP_TIMEOUT_SECONDS)
+            for step in steps.values()
+        ),
+        return_exceptions=True,
+    )
+    for name, result in zip(steps, results):
+        if isinstance(result, BaseException):
+            logger.warning("Warm-up of %s failed: %r", name, result)
+    logger.info("Warm-up finished in %.1f ms", (time.perf_counter() - started) * 1000)
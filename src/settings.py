@@ -1,3 +1,4 @@
+from typing import Literal
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
 
@@ -11,10 +12,27 @@ class MainSettings(BaseSettings):
     APP_HOST: str = "0.0.0.0"
     APP_PORT: int = 8000
 
+    # Production launcher (src/server.py); WEB_WORKERS=0 means one per CPU.
+    WEB_WORKERS: int = 0
+    WEB_BACKLOG: int = 2048
+    WEB_KEEPALIVE_SECONDS: int = 5
+    WEB_LIMIT_CONCURRENCY: int | None = None
+    WEB_ACCESS_LOG: bool = False
+
     POSTGRES_DB: str
     POSTGRES_USER: str
     POSTGRES_PASSWORD: str
     DATABASE_URL: str
+    DB_POOL_SIZE: int = 5
+    DB_MAX_OVERFLOW: int = 10
+
+    # "memory" keeps packages in process (local runs, benchmarks), see
+    # src/data/repositories/memory.py.
+    REPOSITORY_BACKEND: Literal["postgres", "memory"] = "postgres"
+    HOT_CACHE_ENABLED: bool = False
+    HOT_CACHE_MIN_PACKAGES: int = 5000
+    HOT_CACHE_MAX_OWNERS: int = 32
+    HOT_CACHE_TTL_SECONDS: float = 10.0
 
     REDIS_HOST: str = "redis"
     REDIS_PORT: int = 6379
@@ -28,6 +46,38 @@ class MainSettings(BaseSettings):
 
     SECRET_KEY: str
 
+    LOG_LEVEL: str = "INFO"
+    LOG_FORMAT: str = "json"
+    LOG_RATE_LIMITS: dict[str, float] = {"delivery_service.worker": 5.0}
+    SQL_ECHO: bool = False
+
+    PACKAGE_TYPES_CACHE_TTL_SECONDS: int = 300
+    WARMUP_ENABLED: bool = True
+    WARMUP_TIMEOUT_SECONDS: float = 10.0
+
+    TRACING_ENABLED: bool = False
+    TRACING_EXPORTER: Literal["file", "memory"] = "file"
+    TRACING_FILE: str = "traces.jsonl"
+    TRACING_MEMORY_MAX_SPANS: int = 10000
+    TRACE_CONTEXT_TTL_SECONDS: int = 7 * 24 * 3600
+
+    PROFILE_SAMPLE_INTERVAL_SECONDS: float = 0.005
+    PROFILE_TTL_SECONDS: int = 3600
+
+    RATES_REFRESH_SECONDS: float = 120.0
+
+    COST_SWEEP_BATCH_SIZE: int = 500
+    COST_SWEEP_TIME_BUDGET_SECONDS: float = 240.0
+    COST_SWEEP_LEASE_TTL_SECONDS: float = 60.0
+
+    RETENTION_ENABLED: bool = False
+    RETENTION_MODE: Literal["delete", "archive"] = "delete"
+    RETENTION_BATCH_SIZE: int = 500
+    RETENTION_BATCH_PAUSE_SECONDS: float = 0.2
+    RETENTION_OWNER_SCAN_SIZE: int = 1000
+    # How long an owner's session key must stay missing before its packages go.
+    RETENTION_GRACE_SECONDS: int = 30 * 24 * 3600
+
     model_config = SettingsConfigDict(
         env_file=".env", env_file_encoding="utf-8", case_sensitive=False, extra="ignore"
     )
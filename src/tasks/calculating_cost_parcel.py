@@ -1,68 +1,257 @@
 from src.data.db.session import get_db
-from src.utils.logger import logger
+from src.utils.logger import PeriodicSummary, get_logger
 from src.data.models.models import Package
-from sqlalchemy import select
+from src.data.repositories.db_crud import UserDAL
 from src.redis_client import get_redis_client
+from src.settings import settings
 from src.utils.currency_utils import CurrencyService
 from src.utils.delivery_calculator import DeliveryCalculator
+from src.utils.profiling import Profiler, new_profile_id, save_profile
+from src.utils.redis_lease import RedisLease
+from src.utils.tracing import record_packages_priced, span
 import asyncio
+import time
+from collections import defaultdict
+from datetime import datetime, timezone
+from decimal import Decimal
+from uuid import UUID
 
+# Per-parcel records are rate limited (settings.LOG_RATE_LIMITS); progress is
+# reported as periodic summaries instead.
+logger = get_logger("worker")
 
-def calculating_cost_unprocessed_parcels():
-    return asyncio.run(_async_calculating_cost_unprocessed_parcels())
+# Held for the whole sweep so a beat tick that fires while the previous sweep is
+# still running does not reprice the same rows and fight it for locks.
+LEASE_KEY = "lease:cost_sweep"
+# Progress of the current (or last) sweep, updated after every batch.
+RUN_STATE_KEY = "cost_sweep:state"
+MAX_REPORTED_ERRORS = 100
 
 
-async def _async_calculating_cost_unprocessed_parcels():
-    async for session_db in get_db():
-        try:
-            query = select(Package).where(Package.delivery_cost_rub.is_(None))
-            result = await session_db.execute(query)
-            packages = result.scalars().all()
-
-            if not packages:
-                logger.info("No packages without delivery cost found")
-                return {"processed": 0, "message": "No packages to process"}
-
-            redis_client = await get_redis_client()
-            currency_service = CurrencyService(redis_client)
-            calculator = DeliveryCalculator(currency_service)
-
-            processed_count = 0
-            errors = []
-
-            for package in packages:
-                try:
-                    delivery_cost = await calculator.calculate_delivery_cost(
-                        package.weight_kg, package.contents_value_usd
-                    )
-
-                    package.delivery_cost_rub = delivery_cost
-                    processed_count += 1
-
-                    logger.info(
-                        f"Calculated delivery cost for package {package.id}: {delivery_cost} RUB"
-                    )
-
-                except Exception as e:
-                    error_msg = f"Error calculating cost for package {package.id}: {e}"
-                    logger.error(error_msg)
-                    errors.append(error_msg)
-                    continue
-
-            await session_db.commit()
-            await redis_client.close()
-
-            result = {
-                "processed": processed_count,
-                "total_found": len(packages),
-                "errors": errors,
+def calculating_cost_unprocessed_parcels(profile: bool = False):
+    return asyncio.run(_async_calculating_cost_unprocessed_parcels(profile))
+
+
+async def _async_calculating_cost_unprocessed_parcels(profile: bool = False):
+    redis_client = await get_redis_client()
+    try:
+        lease = RedisLease(
+            redis_client, LEASE_KEY, ttl=settings.COST_SWEEP_LEASE_TTL_SECONDS
+        )
+        if not await lease.acquire():
+            logger.info("Previous cost sweep is still running, skipping")
+            return {
+                "processed": 0,
+                "skipped": True,
+                "message": "Previous sweep is still running",
             }
+        try:
+            if not profile:
+                return await _sweep_unpriced_packages(redis_client, lease)
+
+            profile_id = new_profile_id()
+            with Profiler("calculating_cost_unprocessed_parcels") as profiler:
+                result = await _sweep_unpriced_packages(redis_client, lease)
+            await save_profile(redis_client, profile_id, profiler.result())
+            logger.info("Saved profile %s of the cost sweep", profile_id)
+            return {**result, "profile_id": profile_id}
+        finally:
+            await lease.release()
+    finally:
+        await redis_client.close()
+
+
+async def _sweep_unpriced_packages(redis_client, lease: RedisLease) -> dict:
+    """Price unpriced packages batch by batch until done or out of time.
+
+    Every batch is locked with SKIP LOCKED, priced and committed on its own, so
+    stopping at the time budget (or on a lost lease) keeps the work done so far
+    and the next beat tick continues with the remaining rows.
+    """
+    started = time.monotonic()
+    deadline = started + settings.COST_SWEEP_TIME_BUDGET_SECONDS
+    batch_size = settings.COST_SWEEP_BATCH_SIZE
+    state = {
+        "status": "running",
+        "started_at": datetime.now(timezone.utc).isoformat(),
+        "processed": 0,
+        "failed": 0,
+        "batches": 0,
+        "remaining_at_start": 0,
+        "remaining": 0,
+        "stopped_by": "",
+        "duration_seconds": 0,
+        "rows_per_second": 0,
+    }
+    errors = []
+
+    calculator = DeliveryCalculator(CurrencyService(redis_client))
+    progress = PeriodicSummary(
+        logger,
+        "Priced %(priced)d parcels, %(failed)d errors in the last %(seconds).1fs",
+    )
+
+    with span("worker.cost_sweep"):
+        try:
+            async for session_db in get_db():
+                user_dal = UserDAL(session_db)
+                async with session_db.begin():
+                    remaining_at_start = await user_dal.count_unpriced_packages()
+                state["remaining_at_start"] = remaining_at_start
+                await _save_run_state(redis_client, state, started)
+
+                after_id = None
+                state["stopped_by"] = "drained"
+                while True:
+                    if not lease.held:
+                        state["stopped_by"] = "lease_lost"
+                        break
+                    if time.monotonic() >= deadline:
+                        state["stopped_by"] = "time_budget"
+                        break
+
+                    with span("worker.price_batch", batch_size=batch_size):
+                        async with session_db.begin():
+                            packages = await user_dal.lock_unpriced_packages_batch(
+                                after_id, batch_size
+                            )
+                            if not packages:
+                                break
+                            after_id = packages[-1].id
+                            priced_ids, failed = await _price_batch(
+                                user_dal, calculator, packages, errors
+                            )
+                        await _record_priced_traces(redis_client, priced_ids)
+
+                    state["processed"] += len(priced_ids)
+                    state["failed"] += failed
+                    state["batches"] += 1
+                    progress.add(priced=len(priced_ids), failed=failed)
+                    await _save_run_state(redis_client, state, started)
+
+                    if len(packages) < batch_size:
+                        break
+
+                progress.flush()
+                async with session_db.begin():
+                    state["remaining"] = await user_dal.count_unpriced_packages()
+
+        except Exception as e:
+            logger.error("Error in calculating_cost_unprocessed_parcels: %s", e)
+            state["stopped_by"] = "error"
+            state["error"] = str(e)
+        finally:
+            state["status"] = "finished"
+            await _save_run_state(redis_client, state, started)
 
-            logger.info(
-                f"Successfully processed {processed_count} out of {len(packages)} packages"
+    logger.info(
+        "Cost sweep %s: priced %s, failed %s, %s left of %s in %ss",
+        state["stopped_by"],
+        state["processed"],
+        state["failed"],
+        state["remaining"],
+        state["remaining_at_start"],
+        state["duration_seconds"],
+    )
+    return {**state, "errors": errors[:MAX_REPORTED_ERRORS]}
+
+
+async def _price_batch(
+    user_dal: UserDAL,
+    calculator: DeliveryCalculator,
+    packages: list[Package],
+    errors: list[str],
+) -> tuple[list[UUID], int]:
+    """Price a locked batch; returns the ids of priced packages and the failures."""
+    costs = []
+    failed_count = 0
+    stats_deltas = defaultdict(lambda: [0, Decimal("0"), Decimal("0")])
+
+    # One rate table per batch: the cost and the stored USD equivalent of the
+    # contents value come from the same rates.
+    rates = await calculator.currency_service.get_rates()
+    delivery_costs = await calculator.calculate_delivery_costs(
+        [
+            (
+                package.weight_kg,
+                package.contents_value,
+                package.contents_currency,
+            )
+            for package in packages
+        ],
+        rates,
+    )
+
+    for package, delivery_cost in zip(packages, delivery_costs):
+        try:
+            if delivery_cost is None:
+                raise ValueError(
+                    f"no CBR rate for currency {package.contents_currency}"
+                )
+
+            value_usd = calculator.to_usd(
+                package.contents_value, package.contents_currency, rates
+            )
+            costs.append(
+                (package.id, package.owner_session_id, delivery_cost, value_usd)
+            )
+
+            delta = stats_deltas[(package.owner_session_id, package.type_id)]
+            delta[0] += 1
+            delta[1] += delivery_cost
+            # USD values were added to the rollup when the package was created.
+            if package.contents_currency != "USD":
+                delta[2] += value_usd
+
+            logger.debug(
+                "Calculated delivery cost for package %s: %s RUB",
+                package.id,
+                delivery_cost,
             )
-            return result
 
         except Exception as e:
-            logger.error(f"Error in calculating_cost_unprocessed_parcels: {e}")
-            return {"processed": 0, "error": str(e)}
+            logger.error("Error calculating cost for package %s: %s", package.id, e)
+            failed_count += 1
+            if len(errors) < MAX_REPORTED_ERRORS:
+                errors.append(f"Error calculating cost for package {package.id}: {e}")
+            continue
+
+    await user_dal.set_delivery_costs(costs)
+    for (owner_session_id, type_id), delta in stats_deltas.items():
+        count, cost, contents_value_usd = delta
+        await user_dal.increment_package_stats(
+            owner_session_id=owner_session_id,
+            type_id=type_id,
+            total_contents_value_usd=contents_value_usd,
+            calculated_count=count,
+            total_delivery_cost_rub=cost,
+        )
+
+    return [package_id for package_id, *_ in costs], failed_count
+
+
+async def _record_priced_traces(redis_client, package_ids: list[UUID]) -> None:
+    if not settings.TRACING_ENABLED:
+        return
+    try:
+        await record_packages_priced(redis_client, package_ids)
+    except Exception as e:
+        logger.warning("Failed to record package traces: %s", e)
+
+
+async def _save_run_state(redis_client, state: dict, started: float) -> None:
+    duration = time.monotonic() - started
+    state["duration_seconds"] = round(duration, 3)
+    state["rows_per_second"] = (
+        round(state["processed"] / duration, 1) if duration else 0
+    )
+    try:
+        async with redis_client.pipeline(transaction=True) as pipe:
+            pipe.delete(RUN_STATE_KEY)
+            pipe.hset(
+                RUN_STATE_KEY,
+                mapping={key: str(value) for key, value in state.items()},
+            )
+            await pipe.execute()
+    except Exception as e:
+        logger.warning("Failed to save cost sweep state: %s", e)
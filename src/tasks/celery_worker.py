@@ -1,7 +1,12 @@
 from celery import Celery
 from src.settings import settings
 from .calculating_cost_parcel import calculating_cost_unprocessed_parcels
+from .rebuild_package_stats import rebuild_package_stats
+from .refresh_rates import refresh_currency_rates
+from .retention import purge_expired_sessions
 from celery.schedules import crontab
+from celery.signals import setup_logging as celery_setup_logging
+from src.utils.logger import setup_logging
 
 celery_app = Celery(
     "celery_app",
@@ -16,12 +21,46 @@ celery_app.conf.beat_schedule = {
         "task": "src.tasks.celery_worker.calculating_cost_unprocessed_parcels_task",
         "schedule": crontab(minute="*/5"),
     },
+    # Well within CurrencyService.cache_ttl (300 s), so the shared table never
+    # expires while beat runs.
+    "refresh-currency-rates": {
+        "task": "src.tasks.celery_worker.refresh_currency_rates_task",
+        "schedule": settings.RATES_REFRESH_SECONDS,
+    },
 }
+if settings.RETENTION_ENABLED:
+    celery_app.conf.beat_schedule["purge-expired-sessions-daily"] = {
+        "task": "src.tasks.celery_worker.purge_expired_sessions_task",
+        "schedule": crontab(hour=3, minute=30),
+    }
 celery_app.conf.timezone = "UTC"
 
 
+@celery_setup_logging.connect
+def configure_worker_logging(**kwargs):
+    # Having a receiver stops Celery from replacing the root handlers, so the
+    # queued JSON pipeline stays in place; prefork children restart its listener
+    # thread on fork (see src.utils.logger).
+    setup_logging()
+
+
 @celery_app.task(
     name="src.tasks.celery_worker.calculating_cost_unprocessed_parcels_task"
 )
-def calculating_cost_unprocessed_parcels_task():
-    return calculating_cost_unprocessed_parcels()
+def calculating_cost_unprocessed_parcels_task(profile: bool = False):
+    return calculating_cost_unprocessed_parcels(profile)
+
+
+@celery_app.task(name="src.tasks.celery_worker.rebuild_package_stats_task")
+def rebuild_package_stats_task(owner_session_id: str | None = None):
+    return rebuild_package_stats(owner_session_id)
+
+
+@celery_app.task(name="src.tasks.celery_worker.purge_expired_sessions_task")
+def purge_expired_sessions_task(dry_run: bool = False):
+    return purge_expired_sessions(dry_run)
+
+
+@celery_app.task(name="src.tasks.celery_worker.refresh_currency_rates_task")
+def refresh_currency_rates_task():
+    return refresh_currency_rates()
@@ -0,0 +1,42 @@
+"""Backfill / repair of the ``package_stats`` rollup.
+
+Usage: ``python -m src.tasks.rebuild_package_stats [owner_session_id]``
+"""
+
+import asyncio
+import sys
+from src.data.db.session import get_db
+from src.data.repositories.db_crud import UserDAL
+from src.redis_client import get_redis_client
+from src.utils.currency_utils import CurrencyService
+from src.utils.delivery_calculator import DeliveryCalculator
+from src.utils.logger import logger
+
+
+def rebuild_package_stats(owner_session_id: str | None = None):
+    return asyncio.run(_async_rebuild_package_stats(owner_session_id))
+
+
+async def _async_rebuild_package_stats(owner_session_id: str | None = None):
+    # Parcels priced since priced_contents_value_usd exists keep the USD value of
+    # their pricing rate; current rates only cover those priced before it.
+    redis_client = await get_redis_client()
+    try:
+        rates = await CurrencyService(redis_client).get_rates()
+    finally:
+        await redis_client.close()
+    usd_factors = DeliveryCalculator.usd_factors(rates)
+
+    async for session_db in get_db():
+        async with session_db.begin():
+            rows = await UserDAL(session_db).rebuild_package_stats(
+                owner_session_id, usd_factors
+            )
+
+        scope = owner_session_id or "all sessions"
+        logger.info("Rebuilt %s package stats rows for %s", rows, scope)
+        return {"rebuilt": rows}
+
+
+if __name__ == "__main__":
+    rebuild_package_stats(sys.argv[1] if len(sys.argv) > 1 else None)
@@ -0,0 +1,35 @@
+"""Keeps the shared CBR rate table in Redis fresh (celery beat).
+
+The API's quote and package-creation paths only read cached rates, so without
+this refresh the table would expire whenever the cost sweep has nothing to price.
+
+Usage: ``python -m src.tasks.refresh_rates``
+"""
+
+import asyncio
+
+from src.redis_client import get_redis_client
+from src.utils.currency_utils import CurrencyService
+from src.utils.logger import logger
+
+
+def refresh_currency_rates():
+    return asyncio.run(_async_refresh_currency_rates())
+
+
+async def _async_refresh_currency_rates():
+    redis_client = await get_redis_client()
+    try:
+        rates = await CurrencyService(redis_client).refresh_rates()
+    finally:
+        await redis_client.close()
+
+    if rates is None:
+        # Readers keep using the last known table meanwhile.
+        logger.warning("CBR rate refresh failed, keeping the last known table")
+        return {"refreshed": False}
+    return {"refreshed": True, "currencies": len(rates)}
+
+
+if __name__ == "__main__":
+    refresh_currency_rates()
@@ -0,0 +1,199 @@
+"""Removal of packages that belong to expired sessions.
+
+A session is expired once its ``session:<id>`` key has been gone from Redis
+(see ``SESSION_TTL_SECONDS``) for ``RETENTION_GRACE_SECONDS``: the first run
+that misses the key only records when (``retention:missing:<id>``). A missing
+key alone proves nothing - owners created before session keys existed have
+none, and a Redis flush or eviction drops every key at once.
+
+Packages are deleted, or moved to ``packages_archive`` with
+``RETENTION_MODE=archive``, in small batches with a pause between them so the
+job does not compete with live traffic.
+
+Usage: ``python -m src.tasks.retention [--dry-run]``
+"""
+
+import argparse
+import asyncio
+import time
+from src.data.db.session import get_db
+from src.data.repositories.db_crud import UserDAL
+from src.data.repositories.retention_crud import RetentionDAL
+from src.redis_client import get_redis_client
+from src.settings import settings
+from src.utils.currency_utils import CurrencyService
+from src.utils.delivery_calculator import DeliveryCalculator
+from src.utils.logger import get_logger
+
+logger = get_logger("retention")
+
+LAST_RUN_KEY = "retention:last_run"
+MISSING_SINCE_KEY = "retention:missing:{}"
+
+
+def purge_expired_sessions(dry_run: bool = False):
+    return asyncio.run(_async_purge_expired_sessions(dry_run))
+
+
+async def _async_purge_expired_sessions(dry_run: bool = False) -> dict:
+    started = time.monotonic()
+    report = {
+        "dry_run": dry_run,
+        "mode": settings.RETENTION_MODE,
+        "owners_scanned": 0,
+        "owners_expired": 0,
+        "owners_in_grace": 0,
+        "rows_reclaimed": 0,
+        "bytes_reclaimed": 0,
+        "batches": 0,
+    }
+    archive = settings.RETENTION_MODE == "archive"
+
+    redis_client = await get_redis_client()
+    try:
+        async for session_db in get_db():
+            retention_dal = RetentionDAL(session_db)
+            after = ""
+            while True:
+                async with session_db.begin():
+                    owners = await retention_dal.get_owner_ids_after(
+                        after, settings.RETENTION_OWNER_SCAN_SIZE
+                    )
+                if not owners:
+                    break
+                after = owners[-1]
+                report["owners_scanned"] += len(owners)
+
+                expired, in_grace = await _expired_owners(redis_client, owners, dry_run)
+                report["owners_in_grace"] += in_grace
+                for owner_session_id in expired:
+                    report["owners_expired"] += 1
+                    if dry_run:
+                        async with session_db.begin():
+                            rows, size = await retention_dal.measure_owner_packages(
+                                owner_session_id
+                            )
+                        report["rows_reclaimed"] += rows
+                        report["bytes_reclaimed"] += size
+                        continue
+
+                    await _purge_owner(
+                        retention_dal, redis_client, owner_session_id, archive, report
+                    )
+    finally:
+        report["duration_seconds"] = round(time.monotonic() - started, 3)
+        try:
+            await redis_client.hset(
+                LAST_RUN_KEY,
+                mapping={key: str(value) for key, value in report.items()},
+            )
+        finally:
+            await redis_client.close()
+
+    logger.info(
+        "Retention %s: %s of %s owners expired, %s rows / %s bytes %s in %ss",
+        "dry run" if dry_run else "run",
+        report["owners_expired"],
+        report["owners_scanned"],
+        report["rows_reclaimed"],
+        report["bytes_reclaimed"],
+        "reclaimable" if dry_run else "reclaimed",
+        report["duration_seconds"],
+    )
+    return report
+
+
+async def _expired_owners(
+    redis_client, owners: list[str], dry_run: bool = False
+) -> tuple[list[str], int]:
+    """Owners missing their session key for the whole grace period.
+
+    Also returns how many owners are missing the key but still within the
+    grace period. Records when a missing key was first seen (not on a dry run)
+    and forgets it once the key is back.
+    """
+    async with redis_client.pipeline(transaction=False) as pipe:
+        for owner_session_id in owners:
+            pipe.exists(f"session:{owner_session_id}")
+        alive = await pipe.execute()
+
+    now = int(time.time())
+    missing = {}
+    async with redis_client.pipeline(transaction=False) as pipe:
+        for owner_session_id, exists in zip(owners, alive):
+            marker = MISSING_SINCE_KEY.format(owner_session_id)
+            if exists:
+                pipe.delete(marker)
+                continue
+            if not dry_run:
+                # The marker outlives the grace period so a skipped run does not
+                # restart it; a lost marker only ever delays a purge.
+                pipe.set(marker, now, nx=True, ex=2 * settings.RETENTION_GRACE_SECONDS)
+            pipe.get(marker)
+            missing[owner_session_id] = len(pipe) - 1
+        results = await pipe.execute()
+
+    expired = []
+    for owner_session_id, position in missing.items():
+        since = results[position]
+        if since is not None and now - int(since) >= settings.RETENTION_GRACE_SECONDS:
+            expired.append(owner_session_id)
+    return expired, len(missing) - len(expired)
+
+
+async def _purge_owner(
+    retention_dal: RetentionDAL,
+    redis_client,
+    owner_session_id: str,
+    archive: bool,
+    report: dict,
+) -> None:
+    session_db = retention_dal.db_session
+    removed = 0
+    while True:
+        # The session may come back (the id is client supplied) while we work.
+        if await redis_client.exists(f"session:{owner_session_id}"):
+            logger.info("Session %s became active, stopping", owner_session_id)
+            break
+
+        async with session_db.begin():
+            rows, size = await retention_dal.remove_owner_packages_batch(
+                owner_session_id, settings.RETENTION_BATCH_SIZE, archive=archive
+            )
+        removed += rows
+        report["rows_reclaimed"] += rows
+        report["bytes_reclaimed"] += size
+        report["batches"] += 1
+
+        await asyncio.sleep(settings.RETENTION_BATCH_PAUSE_SECONDS)
+        if rows < settings.RETENTION_BATCH_SIZE:
+            break
+
+    # Read before the transaction: get_rates may have to wait for CBR.
+    usd_factors = None
+    if removed:
+        rates = await CurrencyService(redis_client).get_rates()
+        usd_factors = DeliveryCalculator.usd_factors(rates)
+
+    async with session_db.begin():
+        if await retention_dal.owner_has_packages(owner_session_id):
+            # Locked rows are skipped (a later run removes them) and a returning
+            # session keeps the rest; the rollup has to match what is left.
+            if removed:
+                await UserDAL(session_db).rebuild_package_stats(
+                    owner_session_id, usd_factors
+                )
+            return
+        await retention_dal.delete_owner_stats(owner_session_id)
+    await redis_client.delete(MISSING_SINCE_KEY.format(owner_session_id))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "--dry-run",
+        action="store_true",
+        help="only report what would be reclaimed",
+    )
+    args = parser.parse_args()
+    print(purge_expired_sessions(dry_run=args.dry_run))
@@ -1,41 +1,171 @@
-import aiohttp
+import asyncio
+import time
 from src.utils.logger import logger
+from src.utils.tracing import span
 import redis.asyncio as redis
 
 
+CBR_DAILY_URL = "https://www.cbr-xml-daily.ru/daily_json.js"
+FALLBACK_RATES = {"RUB": 1.0, "USD": 90.0}
+
+
+class UnsupportedCurrencyError(ValueError):
+    pass
+
+
+class RatesUnavailableError(RuntimeError):
+    pass
+
+
 class CurrencyService:
+    """RUB rates for every currency published by CBR.
+
+    The whole ``daily_json.js`` table is fetched once per refresh and kept both
+    as a single Redis hash (shared by all processes) and as an in-process copy,
+    so pricing a batch of parcels costs at most one Redis round trip.
+
+    ``refresh_currency_rates_task`` refetches the table before ``cache_ttl``
+    runs out. Every fetched table is also kept without expiry under
+    ``last_known_key``: if the current one is missing (refresh failed, CBR
+    down), the cached-only readers use the last known table instead.
+    """
+
+    _local_rates: dict[str, float] | None = None
+    _local_expires_at: float = 0.0
+    _local_is_fallback: bool = False
+
     def __init__(self, redis_client: redis.Redis):
         self.redis = redis_client
-        self.cache_key = "usd_rub_rate"
+        self.cache_key = "cbr_rates"
+        self.last_known_key = "cbr_rates:last_known"
         self.cache_ttl = 300
+        self.local_ttl = 60
 
-    async def get_usd_rate(self) -> float:
-        cached_rate = await self.redis.get(self.cache_key)
-        if cached_rate:
-            logger.info("Using cached USD rate")
-            return float(cached_rate)
+    async def get_rates(self) -> dict[str, float]:
+        """Currency code -> RUB per one unit of that currency."""
+        rates = self._get_local_rates()
+        if rates is not None:
+            return rates
 
-        rate = await self._fetch_usd_rate()
+        cached_rates = await self.redis.hgetall(self.cache_key)
+        if cached_rates:
+            rates = {code: float(value) for code, value in cached_rates.items()}
+            self._set_local_rates(rates)
+            return rates
 
-        await self.redis.setex(self.cache_key, self.cache_ttl, str(rate))
-        logger.info(f"Fetched new USD rate: {rate}")
+        rates = await self.refresh_rates()
+        if rates is not None:
+            return rates
 
-        return rate
+        last_known = await self.redis.hgetall(self.last_known_key)
+        if last_known:
+            rates = {code: float(value) for code, value in last_known.items()}
+            self._set_local_rates(rates)
+            return rates
 
-    async def _fetch_usd_rate(self) -> float:
-        url = "https://www.cbr-xml-daily.ru/daily_json.js"
+        self._set_local_rates(FALLBACK_RATES, is_fallback=True)
+        return FALLBACK_RATES
 
-        try:
-            async with aiohttp.ClientSession() as session:
-                async with session.get(url, timeout=10) as response:
-                    if response.status != 200:
-                        raise Exception(f"API returned status {response.status}")
+    async def refresh_rates(self) -> dict[str, float] | None:
+        """Fetch the table from CBR and store it; ``None`` if the fetch failed."""
+        rates = await self._fetch_rates()
+        if rates is None:
+            return None
+
+        async with self.redis.pipeline(transaction=True) as pipe:
+            pipe.delete(self.cache_key)
+            pipe.hset(self.cache_key, mapping=rates)
+            pipe.expire(self.cache_key, self.cache_ttl)
+            pipe.delete(self.last_known_key)
+            pipe.hset(self.last_known_key, mapping=rates)
+            await pipe.execute()
+        self._set_local_rates(rates)
+        logger.info("Fetched new CBR rate table: %s currencies", len(rates))
+
+        return rates
+
+    async def get_cached_rates(self, timeout: float) -> dict[str, float]:
+        """Rates from the in-process copy or Redis only, never from CBR.
 
-                    data = await response.json()
-                    usd_rate = data["Valute"]["USD"]["Value"]
-                    logger.info(f"Fetched USD rate from API: {usd_rate}")
-                    return usd_rate
+        Meant for latency-bound callers: never blocks on cbr-xml-daily. Falls
+        back to the last known table, so ``RatesUnavailableError`` is raised only
+        when no table was ever loaded (or Redis is too slow and this process has
+        none).
+        """
+        rates = self._get_local_rates()
+        if rates is not None and not type(self)._local_is_fallback:
+            return rates
 
+        try:
+            async with self.redis.pipeline(transaction=False) as pipe:
+                pipe.hgetall(self.cache_key)
+                pipe.hgetall(self.last_known_key)
+                cached_rates, last_known = await asyncio.wait_for(
+                    pipe.execute(), timeout
+                )
         except Exception as e:
-            logger.error(f"Error fetching USD rate: {e}")
-            return 90.0
+            last_known_local = self._get_last_known_local_rates()
+            if last_known_local is not None:
+                logger.warning("Using the last known rates: %r", e)
+                return last_known_local
+            raise RatesUnavailableError(f"Cached rates are not available: {e!r}")
+
+        cached_rates = cached_rates or last_known
+        if not cached_rates:
+            raise RatesUnavailableError("Cached rates are not available")
+
+        rates = {code: float(value) for code, value in cached_rates.items()}
+        self._set_local_rates(rates)
+        return rates
+
+    async def get_rate(self, currency: str) -> float:
+        rates = await self.get_rates()
+        try:
+            return rates[currency]
+        except KeyError:
+            raise UnsupportedCurrencyError(f"Currency {currency} is not supported")
+
+    async def get_usd_rate(self) -> float:
+        return await self.get_rate("USD")
+
+    def _get_local_rates(self) -> dict[str, float] | None:
+        cls = type(self)
+        if cls._local_rates is not None and time.monotonic() < cls._local_expires_at:
+            return cls._local_rates
+        return None
+
+    def _get_last_known_local_rates(self) -> dict[str, float] | None:
+        cls = type(self)
+        return None if cls._local_is_fallback else cls._local_rates
+
+    def _set_local_rates(
+        self, rates: dict[str, float], is_fallback: bool = False
+    ) -> None:
+        cls = type(self)
+        cls._local_rates = rates
+        cls._local_expires_at = time.monotonic() + self.local_ttl
+        cls._local_is_fallback = is_fallback
+
+    async def _fetch_rates(self) -> dict[str, float] | None:
+        # Imported lazily: only the refresh path needs it and it is slow to import.
+        import aiohttp
+
+        with span("cbr.fetch_rates"):
+            try:
+                async with aiohttp.ClientSession() as session:
+                    async with session.get(CBR_DAILY_URL, timeout=10) as response:
+                        if response.status != 200:
+                            raise Exception(f"API returned status {response.status}")
+
+                        data = await response.json(content_type=None)
+                        rates = {
+                            code: valute["Value"] / valute["Nominal"]
+                            for code, valute in data["Valute"].items()
+                        }
+                        rates["RUB"] = 1.0
+                        logger.info("Fetched USD rate from API: %s", rates["USD"])
+                        return rates
+
+            except Exception as e:
+                logger.error("Error fetching CBR rates: %s", e)
+                return None
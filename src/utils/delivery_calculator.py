@@ -1,23 +1,114 @@
 from decimal import Decimal
+from typing import Sequence
 from src.utils.logger import logger
 from src.utils.currency_utils import CurrencyService
 
+WEIGHT_RATE_USD = Decimal("0.5")
+CONTENTS_RATE = Decimal("0.01")
+
 
 class DeliveryCalculator:
     def __init__(self, currency_service: CurrencyService):
         self.currency_service = currency_service
 
     async def calculate_delivery_cost(
-        self, weight_kg: Decimal, contents_value_usd: Decimal
+        self, weight_kg: Decimal, contents_value: Decimal, currency: str = "USD"
     ) -> Decimal:
         usd_rate = await self.currency_service.get_usd_rate()
+        currency_rate = await self.currency_service.get_rate(currency)
 
-        cost = (
-            weight_kg * Decimal("0.5") + contents_value_usd * Decimal("0.01")
-        ) * Decimal(str(usd_rate))
-        cost = cost.quantize(Decimal("0.01"))
+        cost = self._calculate(
+            weight_kg,
+            contents_value,
+            Decimal(str(usd_rate)),
+            Decimal(str(currency_rate)),
+        )
 
         logger.debug(
-            f"Calculated delivery cost: {cost} (weight: {weight_kg}, value: {contents_value_usd}, rate: {usd_rate})"
+            "Calculated delivery cost: %s (weight: %s, value: %s %s, rate: %s)",
+            cost,
+            weight_kg,
+            contents_value,
+            currency,
+            currency_rate,
         )
         return cost
+
+    async def calculate_delivery_costs(
+        self,
+        parcels: Sequence[tuple[Decimal, Decimal, str]],
+        rates: dict[str, float] | None = None,
+    ) -> list[Decimal | None]:
+        """Price ``(weight_kg, contents_value, currency)`` tuples in one pass.
+
+        ``rates`` may be passed by callers that already hold a rate table.
+        """
+        if rates is None:
+            rates = await self.currency_service.get_rates()
+        return self.price_parcels(parcels, rates)
+
+    @classmethod
+    def price_parcels(
+        cls,
+        parcels: Sequence[tuple[Decimal, Decimal, str]],
+        rates: dict[str, float],
+    ) -> list[Decimal | None]:
+        """Price parcels against a rate table without any I/O.
+
+        Parcels are grouped by currency so every group needs a single rate lookup.
+        The result is aligned with ``parcels``; ``None`` marks a currency CBR does
+        not publish.
+        """
+        usd_rate = Decimal(str(rates["USD"]))
+
+        by_currency: dict[str, list[int]] = {}
+        for index, (_, _, currency) in enumerate(parcels):
+            by_currency.setdefault(currency, []).append(index)
+
+        costs: list[Decimal | None] = [None] * len(parcels)
+        for currency, indexes in by_currency.items():
+            if currency not in rates:
+                logger.warning(
+                    "No CBR rate for %s, skipping %s parcels", currency, len(indexes)
+                )
+                continue
+            currency_rate = Decimal(str(rates[currency]))
+            for index in indexes:
+                weight_kg, contents_value, _ = parcels[index]
+                costs[index] = cls._calculate(
+                    weight_kg, contents_value, usd_rate, currency_rate
+                )
+
+        return costs
+
+    @staticmethod
+    def to_usd(
+        amount: Decimal, currency: str, rates: dict[str, float]
+    ) -> Decimal | None:
+        """``amount`` of ``currency`` in USD; ``None`` if CBR has no rate for it."""
+        if currency == "USD":
+            return amount
+        if currency not in rates:
+            return None
+        factor = Decimal(str(rates[currency])) / Decimal(str(rates["USD"]))
+        return (amount * factor).quantize(Decimal("0.01"))
+
+    @staticmethod
+    def usd_factors(rates: dict[str, float]) -> dict[str, Decimal]:
+        """Currency code -> USD per one unit, for converting many amounts at once."""
+        usd_rate = Decimal(str(rates["USD"]))
+        return {code: Decimal(str(rate)) / usd_rate for code, rate in rates.items()}
+
+    @staticmethod
+    def _calculate(
+        weight_kg: Decimal,
+        contents_value: Decimal,
+        usd_rate: Decimal,
+        currency_rate: Decimal,
+    ) -> Decimal:
+        # The weight tariff is set in USD, the contents fee in the declared currency.
+        cost = (
+            weight_kg * WEIGHT_RATE_USD * usd_rate
+            + contents_value * CONTENTS_RATE * currency_rate
+        )
+        return cost.quantize(Decimal("0.01"))
@@ -1,7 +1,191 @@
+import atexit
+import json
 import logging
+import os
+import queue
+import sys
+import threading
+import time
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener
 
+from src.settings import settings
 
-logging.basicConfig(
-    level=logging.INFO, format="%(asctime)s [%(levelname)s] %(name)s - %(message)s"
-)
+TEXT_FORMAT = "%(asctime)s [%(levelname)s] %(name)s - %(message)s"
+
+# Attributes every LogRecord has; anything else was passed via ``extra``.
+_RECORD_ATTRS = frozenset(logging.LogRecord("", 0, "", 0, "", None, None).__dict__) | {
+    "message",
+    "asctime",
+    "taskName",
+}
+
+_listener: QueueListener | None = None
+_queue_handler: QueueHandler | None = None
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line; ``extra`` fields are emitted as top-level keys."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        payload = {
+            "ts": datetime.fromtimestamp(record.created, timezone.utc).isoformat(),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        for key, value in record.__dict__.items():
+            if key not in _RECORD_ATTRS and not key.startswith("_"):
+                payload[key] = value
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            payload["exc_info"] = record.exc_text
+        return json.dumps(payload, default=str, ensure_ascii=False)
+
+
+class RateLimitFilter(logging.Filter):
+    """Token bucket per call site: at most ``rate`` records per second.
+
+    Dropped records are counted and the count is attached to the next record
+    that passes as ``suppressed``, so bursts turn into periodic lines. With
+    ``name`` only records of that logger and its children are limited (the
+    usual ``logging.Filter`` prefix match), the rest pass untouched; that is
+    how it is used on the queue handler, which sees every propagated record.
+    """
+
+    def __init__(self, rate: float, burst: int | None = None, name: str = ""):
+        super().__init__(name)
+        self.rate = rate
+        self.burst = burst or max(1, int(rate))
+        self._buckets: dict[tuple[str, int], tuple[float, float, int]] = {}
+        self._lock = threading.Lock()
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if not super().filter(record):
+            return True
+        key = (record.pathname, record.lineno)
+        now = time.monotonic()
+        with self._lock:
+            tokens, updated_at, suppressed = self._buckets.get(
+                key, (float(self.burst), now, 0)
+            )
+            tokens = min(float(self.burst), tokens + (now - updated_at) * self.rate)
+            if tokens < 1:
+                self._buckets[key] = (tokens, now, suppressed + 1)
+                return False
+            self._buckets[key] = (tokens - 1, now, 0)
+
+        if suppressed:
+            record.suppressed = suppressed
+        return True
+
+
+class PeriodicSummary:
+    """Accumulate per-item counters and log them once per ``interval`` seconds.
+
+    ``message`` is a ``%(name)s``-style template over the counters plus
+    ``seconds`` (the length of the reported window).
+    """
+
+    def __init__(
+        self,
+        logger: logging.Logger,
+        message: str,
+        interval: float = 10.0,
+        level: int = logging.INFO,
+    ):
+        self.logger = logger
+        self.message = message
+        self.interval = interval
+        self.level = level
+        self._counters: dict[str, float] = {}
+        self._started_at = time.monotonic()
+
+    def add(self, **counters: float) -> None:
+        for name, value in counters.items():
+            self._counters[name] = self._counters.get(name, 0) + value
+        if time.monotonic() - self._started_at >= self.interval:
+            self.flush()
+
+    def flush(self) -> None:
+        if self._counters:
+            now = time.monotonic()
+            self.logger.log(
+                self.level,
+                self.message,
+                {**self._counters, "seconds": now - self._started_at},
+            )
+        self._counters = {}
+        self._started_at = time.monotonic()
+
+
+def get_logger(name: str, rate_limit: float | None = None) -> logging.Logger:
+    """Child of the service logger, optionally rate limited per call site."""
+    child = logging.getLogger(f"delivery_service.{name}")
+    if rate_limit is not None and not any(
+        isinstance(item, RateLimitFilter) for item in child.filters
+    ):
+        child.addFilter(RateLimitFilter(rate_limit))
+    return child
+
+
+def setup_logging() -> None:
+    """Route all records through a queue so handlers' I/O runs off the event loop.
+
+    The caller only enqueues the record; a ``QueueListener`` thread formats and
+    writes it. Safe to call more than once. Forked children (Celery prefork
+    workers) get their own queue and listener, see ``_restart_listener_in_child``.
+    """
+    global _listener, _queue_handler
+    if _listener is not None:
+        return
+
+    stream_handler = logging.StreamHandler(sys.stderr)
+    if settings.LOG_FORMAT == "json":
+        stream_handler.setFormatter(JsonFormatter())
+    else:
+        stream_handler.setFormatter(logging.Formatter(TEXT_FORMAT))
+
+    log_queue: queue.SimpleQueue = queue.SimpleQueue()
+    _queue_handler = QueueHandler(log_queue)
+    root = logging.getLogger()
+    root.handlers = [_queue_handler]
+    root.setLevel(settings.LOG_LEVEL.upper())
+
+    if settings.SQL_ECHO:
+        logging.getLogger("sqlalchemy.engine").setLevel(logging.INFO)
+
+    # On the handler, not the loggers: logger filters do not apply to records
+    # propagated from child loggers.
+    for name, rate in settings.LOG_RATE_LIMITS.items():
+        _queue_handler.addFilter(RateLimitFilter(rate, name=name))
+
+    _listener = QueueListener(log_queue, stream_handler, respect_handler_level=True)
+    _listener.start()
+    atexit.register(_stop_listener)
+    os.register_at_fork(after_in_child=_restart_listener_in_child)
+
+
+def _restart_listener_in_child() -> None:
+    # The listener thread does not survive fork(): without a new one the child's
+    # records would pile up in the inherited queue and never be written. Records
+    # already queued there are the parent's and are written by the parent.
+    global _listener
+    if _listener is None:
+        return
+    log_queue: queue.SimpleQueue = queue.SimpleQueue()
+    _queue_handler.queue = log_queue
+    _listener = QueueListener(
+        log_queue, *_listener.handlers, respect_handler_level=True
+    )
+    _listener.start()
+
+
+def _stop_listener() -> None:
+    if _listener is not None:
+        _listener.stop()
+
+
+setup_logging()
 logger = logging.getLogger("delivery_service")
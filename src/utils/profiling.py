@@ -0,0 +1,231 @@
+"""Opt-in sampling profiler for single requests and worker runs.
+
+A ``Profiler`` samples the stack of the thread that started it from a helper
+thread and records SQL statement timings of the same context via engine events.
+Nothing is installed until the first profile starts and the engine listeners are
+removed again when the last one stops, so there is no cost while profiling is
+not used.
+
+The result is stored in Redis under ``profile:<id>`` (``PROFILE_TTL_SECONDS``);
+``collapsed`` is in the folded-stacks format read by flamegraph.pl and
+speedscope.
+
+Usage:
+``python -m src.utils.profiling sign /api/packages`` - value for the ``X-Profile``
+header, ``python -m src.utils.profiling dump <id> > profile.folded`` - stacks of
+a stored profile.
+"""
+
+import argparse
+import asyncio
+import contextvars
+import hashlib
+import hmac
+import json
+import os
+import sys
+import threading
+import time
+import uuid
+from collections import Counter
+
+from sqlalchemy import event
+
+from src.settings import settings
+
+PROFILE_KEY = "profile:{}"
+MAX_SQL_STATEMENTS = 500
+
+_current_profiler: contextvars.ContextVar["Profiler | None"] = contextvars.ContextVar(
+    "current_profiler", default=None
+)
+_sql_listeners_lock = threading.Lock()
+_active_profilers = 0
+
+
+class Profiler:
+    """Stack sampler for the current thread plus SQL timings of the current context.
+
+    The sampler sees the whole thread, so on the API event loop concurrent
+    requests show up in the stacks as well; SQL timings are limited to the
+    profiled context.
+    """
+
+    def __init__(self, label: str, interval: float | None = None):
+        self.label = label
+        self.interval = interval or settings.PROFILE_SAMPLE_INTERVAL_SECONDS
+        self.stacks: Counter[str] = Counter()
+        self.sql: list[dict] = []
+        self._thread_id = threading.get_ident()
+        self._stopped = threading.Event()
+        self._sampler: threading.Thread | None = None
+        self._token: contextvars.Token | None = None
+        self._started_at = 0.0
+        self._duration = 0.0
+
+    def __enter__(self) -> "Profiler":
+        self.start()
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.stop()
+
+    def start(self) -> None:
+        _register_sql_listeners()
+        self._token = _current_profiler.set(self)
+        self._started_at = time.perf_counter()
+        self._sampler = threading.Thread(
+            target=self._sample, name="profiler-sampler", daemon=True
+        )
+        self._sampler.start()
+
+    def stop(self) -> None:
+        self._stopped.set()
+        self._sampler.join()
+        self._duration = time.perf_counter() - self._started_at
+        _current_profiler.reset(self._token)
+        _unregister_sql_listeners()
+
+    def result(self) -> dict:
+        return {
+            "label": self.label,
+            "duration_ms": round(self._duration * 1000, 3),
+            "interval_ms": self.interval * 1000,
+            "samples": sum(self.stacks.values()),
+            "sql_total_ms": round(sum(item["duration_ms"] for item in self.sql), 3),
+            "sql": self.sql,
+            "collapsed": "\n".join(
+                f"{stack} {count}" for stack, count in self.stacks.most_common()
+            ),
+        }
+
+    def _sample(self) -> None:
+        while not self._stopped.wait(self.interval):
+            frame = sys._current_frames().get(self._thread_id)
+            if frame is None:
+                continue
+            names = []
+            while frame is not None:
+                code = frame.f_code
+                names.append(
+                    f"{code.co_name}@{os.path.basename(code.co_filename)}:"
+                    f"{code.co_firstlineno}"
+                )
+                frame = frame.f_back
+            self.stacks[";".join(reversed(names))] += 1
+
+    def _record_sql(self, statement: str, duration: float) -> None:
+        if len(self.sql) < MAX_SQL_STATEMENTS:
+            self.sql.append(
+                {
+                    "statement": " ".join(statement.split()),
+                    "duration_ms": round(duration * 1000, 3),
+                }
+            )
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if _current_profiler.get() is not None:
+        context._profiling_started_at = time.perf_counter()
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    profiler = _current_profiler.get()
+    started_at = getattr(context, "_profiling_started_at", None)
+    if profiler is not None and started_at is not None:
+        profiler._record_sql(statement, time.perf_counter() - started_at)
+
+
+def _register_sql_listeners() -> None:
+    global _active_profilers
+    # Imported here so importing this module does not create the engine.
+    from src.data.db.session import engine
+
+    with _sql_listeners_lock:
+        if _active_profilers == 0:
+            event.listen(
+                engine.sync_engine, "before_cursor_execute", _before_cursor_execute
+            )
+            event.listen(
+                engine.sync_engine, "after_cursor_execute", _after_cursor_execute
+            )
+        _active_profilers += 1
+
+
+def _unregister_sql_listeners() -> None:
+    global _active_profilers
+    from src.data.db.session import engine
+
+    with _sql_listeners_lock:
+        _active_profilers -= 1
+        if _active_profilers == 0:
+            event.remove(
+                engine.sync_engine, "before_cursor_execute", _before_cursor_execute
+            )
+            event.remove(
+                engine.sync_engine, "after_cursor_execute", _after_cursor_execute
+            )
+
+
+def new_profile_id() -> str:
+    return uuid.uuid4().hex
+
+
+async def save_profile(redis_client, profile_id: str, result: dict) -> None:
+    await redis_client.set(
+        PROFILE_KEY.format(profile_id),
+        json.dumps(result),
+        ex=settings.PROFILE_TTL_SECONDS,
+    )
+
+
+def _signature(path: str, expires: int) -> str:
+    return hmac.new(
+        settings.SECRET_KEY.encode(), f"{path}:{expires}".encode(), hashlib.sha256
+    ).hexdigest()
+
+
+def sign_profile_request(path: str, ttl: int = 300) -> str:
+    """``X-Profile`` header value that allows profiling ``path`` for ``ttl`` seconds."""
+    expires = int(time.time()) + ttl
+    return f"{expires}.{_signature(path, expires)}"
+
+
+def verify_profile_header(value: str, path: str) -> bool:
+    expires, _, signature = value.partition(".")
+    if not expires.isdigit() or int(expires) < time.time():
+        return False
+    return hmac.compare_digest(signature, _signature(path, int(expires)))
+
+
+async def _load_profile(profile_id: str) -> dict | None:
+    from src.redis_client import get_redis_client
+
+    redis_client = await get_redis_client()
+    try:
+        value = await redis_client.get(PROFILE_KEY.format(profile_id))
+    finally:
+        await redis_client.close()
+    return json.loads(value) if value else None
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    commands = parser.add_subparsers(dest="command", required=True)
+    sign = commands.add_parser("sign", help="X-Profile header value for a path")
+    sign.add_argument("path")
+    sign.add_argument("--ttl", type=int, default=300)
+    dump = commands.add_parser("dump", help="print a stored profile")
+    dump.add_argument("profile_id")
+    dump.add_argument(
+        "--json", action="store_true", help="whole profile instead of stacks"
+    )
+    args = parser.parse_args()
+
+    if args.command == "sign":
+        print(sign_profile_request(args.path, args.ttl))
+    else:
+        profile = asyncio.run(_load_profile(args.profile_id))
+        if profile is None:
+            sys.exit(f"Profile {args.profile_id} not found")
+        print(json.dumps(profile, indent=2) if args.json else profile["collapsed"])
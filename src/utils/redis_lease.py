@@ -0,0 +1,91 @@
+import asyncio
+import uuid
+
+import redis.asyncio as redis
+
+from src.utils.logger import logger
+
+# Renew/release only while the key still holds our token, so a run whose lease
+# already expired can never extend or drop the lease of the run that replaced it.
+RENEW_SCRIPT = """
+if redis.call("get", KEYS[1]) == ARGV[1] then
+    return redis.call("pexpire", KEYS[1], ARGV[2])
+end
+return 0
+"""
+
+RELEASE_SCRIPT = """
+if redis.call("get", KEYS[1]) == ARGV[1] then
+    return redis.call("del", KEYS[1])
+end
+return 0
+"""
+
+
+class RedisLease:
+    """Single-holder lease on a Redis key, renewed in the background while held.
+
+    Usage::
+
+        lease = RedisLease(redis_client, "lease:job", ttl=60)
+        if await lease.acquire():
+            try:
+                while lease.held: ...
+            finally:
+                await lease.release()
+
+    If the holder dies the key expires after ``ttl`` seconds and the next run can
+    take over. ``held`` turns false as soon as a renewal fails, so long loops
+    should check it between units of work.
+    """
+
+    def __init__(self, redis_client: redis.Redis, key: str, ttl: float = 60.0):
+        self.redis = redis_client
+        self.key = key
+        self.ttl = ttl
+        self.token = uuid.uuid4().hex
+        self.held = False
+        self._renew_task: asyncio.Task | None = None
+
+    async def acquire(self) -> bool:
+        acquired = await self.redis.set(
+            self.key, self.token, nx=True, px=int(self.ttl * 1000)
+        )
+        if not acquired:
+            return False
+        self.held = True
+        self._renew_task = asyncio.create_task(self._renew_loop())
+        return True
+
+    async def release(self) -> None:
+        if self._renew_task is not None:
+            self._renew_task.cancel()
+            try:
+                await self._renew_task
+            except asyncio.CancelledError:
+                pass
+            self._renew_task = None
+        if self.held:
+            self.held = False
+            await self.redis.eval(RELEASE_SCRIPT, 1, self.key, self.token)
+
+    async def _renew_loop(self) -> None:
+        loop = asyncio.get_running_loop()
+        renewed_at = loop.time()
+        while self.held:
+            await asyncio.sleep(self.ttl / 3)
+            try:
+                renewed = await self.redis.eval(
+                    RENEW_SCRIPT, 1, self.key, self.token, int(self.ttl * 1000)
+                )
+            except Exception as e:
+                # Transient Redis errors are retried until the lease would expire.
+                logger.warning("Failed to renew lease %s: %s", self.key, e)
+                if loop.time() - renewed_at < self.ttl:
+                    continue
+                renewed = 0
+            if not renewed:
+                logger.warning("Lost lease %s", self.key)
+                self.held = False
+                return
+            renewed_at = loop.time()
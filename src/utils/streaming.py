@@ -0,0 +1,29 @@
+import zlib
+from typing import AsyncIterator
+
+
+def accepts_gzip(accept_encoding: str | None) -> bool:
+    """Check whether the client accepts a gzip-encoded response body."""
+    if not accept_encoding:
+        return False
+    for item in accept_encoding.split(","):
+        coding, _, params = item.strip().partition(";")
+        if coding.strip().lower() not in ("gzip", "*"):
+            continue
+        quality = params.strip().replace(" ", "")
+        if quality in ("q=0", "q=0.0", "q=0.00", "q=0.000"):
+            continue
+        return True
+    return False
+
+
+async def gzip_stream(
+    chunks: AsyncIterator[bytes], level: int = 6
+) -> AsyncIterator[bytes]:
+    """Compress an async byte stream on the fly without buffering the whole body."""
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+    async for chunk in chunks:
+        compressed = compressor.compress(chunk)
+        if compressed:
+            yield compressed
+    yield compressor.flush()
@@ -0,0 +1,286 @@
+"""Built-in lightweight tracing (``TRACING_ENABLED``).
+
+Spans nest through a context variable and are exported as JSON lines to
+``TRACING_FILE`` (written off the event loop by a queue listener thread) or
+kept in memory (``TRACING_EXPORTER=memory``, see ``get_finished_spans``).
+While tracing is disabled ``span`` returns a shared no-op context manager and
+``traced_methods`` leaves classes untouched.
+
+A package's trace context is stored in Redis at creation
+(``trace:package:<id>``) and picked up by the cost worker, which emits a
+``package.priced`` span in the creation trace covering creation to pricing.
+
+Usage: ``python -m src.utils.tracing report traces.jsonl`` - duration
+percentiles per span name.
+"""
+
+import argparse
+import atexit
+import contextlib
+import contextvars
+import functools
+import inspect
+import json
+import logging
+import os
+import queue
+import secrets
+import statistics
+import time
+from collections import defaultdict, deque
+from logging.handlers import QueueHandler, QueueListener
+
+from src.settings import settings
+
+PACKAGE_TRACE_KEY = "trace:package:{}"
+
+_current_span: contextvars.ContextVar["Span | None"] = contextvars.ContextVar(
+    "current_span", default=None
+)
+_noop = contextlib.nullcontext()
+_memory_spans: deque = deque(maxlen=settings.TRACING_MEMORY_MAX_SPANS)
+_span_logger: logging.Logger | None = None
+
+
+class Span:
+    __slots__ = (
+        "trace_id",
+        "span_id",
+        "parent_id",
+        "name",
+        "attributes",
+        "start_ns",
+        "duration_ms",
+        "status",
+        "_started",
+        "_token",
+    )
+
+    def __init__(
+        self,
+        name: str,
+        attributes: dict,
+        trace_id: str | None = None,
+        parent_id: str | None = None,
+    ):
+        parent = _current_span.get()
+        if trace_id is None and parent is not None:
+            trace_id, parent_id = parent.trace_id, parent.span_id
+        self.trace_id = trace_id or secrets.token_hex(16)
+        self.parent_id = parent_id
+        self.span_id = secrets.token_hex(8)
+        self.name = name
+        self.attributes = attributes
+        self.status = "ok"
+        self.start_ns = 0
+        self.duration_ms = 0.0
+
+    def __enter__(self) -> "Span":
+        self.start_ns = time.time_ns()
+        self._started = time.perf_counter()
+        self._token = _current_span.set(self)
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.duration_ms = (time.perf_counter() - self._started) * 1000
+        _current_span.reset(self._token)
+        if exc is not None:
+            self.status = "error"
+            self.attributes["error"] = repr(exc)
+        _export(self.to_dict())
+
+    def set(self, **attributes) -> None:
+        self.attributes.update(attributes)
+
+    def to_dict(self) -> dict:
+        return {
+            "trace_id": self.trace_id,
+            "span_id": self.span_id,
+            "parent_id": self.parent_id,
+            "name": self.name,
+            "start_ns": self.start_ns,
+            "duration_ms": round(self.duration_ms, 3),
+            "status": self.status,
+            "attributes": self.attributes,
+        }
+
+
+def span(
+    name: str, trace_id: str | None = None, parent_id: str | None = None, **attributes
+):
+    """Child span of the current one (or a new trace); a no-op when disabled.
+
+    ``trace_id``/``parent_id`` continue a trace started elsewhere.
+    """
+    if not settings.TRACING_ENABLED:
+        return _noop
+    return Span(name, attributes, trace_id, parent_id)
+
+
+def current_span() -> "Span | None":
+    return _current_span.get()
+
+
+def record_span(
+    name: str,
+    trace_id: str,
+    parent_id: str | None,
+    start_ns: int,
+    duration_ms: float,
+    **attributes,
+) -> None:
+    """Export a span measured elsewhere, e.g. across processes."""
+    _export(
+        {
+            "trace_id": trace_id,
+            "span_id": secrets.token_hex(8),
+            "parent_id": parent_id,
+            "name": name,
+            "start_ns": start_ns,
+            "duration_ms": round(duration_ms, 3),
+            "status": "ok",
+            "attributes": attributes,
+        }
+    )
+
+
+def traced_methods(prefix: str):
+    """Class decorator: a span around every public coroutine method."""
+
+    def decorate(cls):
+        if not settings.TRACING_ENABLED:
+            return cls
+        for name, method in list(vars(cls).items()):
+            if name.startswith("_") or not inspect.iscoroutinefunction(method):
+                continue
+            setattr(cls, name, _traced(f"{prefix}.{name}", method))
+        return cls
+
+    return decorate
+
+
+def _traced(span_name: str, method):
+    @functools.wraps(method)
+    async def wrapper(*args, **kwargs):
+        with Span(span_name, {}):
+            return await method(*args, **kwargs)
+
+    return wrapper
+
+
+async def save_package_trace(redis_client, package_id) -> None:
+    """Remember the current trace of a new package for the pricing worker."""
+    creating_span = _current_span.get()
+    if creating_span is None:
+        return
+    await redis_client.set(
+        PACKAGE_TRACE_KEY.format(package_id),
+        json.dumps(
+            {
+                "trace_id": creating_span.trace_id,
+                "span_id": creating_span.span_id,
+                "created_ns": time.time_ns(),
+            }
+        ),
+        ex=settings.TRACE_CONTEXT_TTL_SECONDS,
+    )
+
+
+async def record_packages_priced(redis_client, package_ids) -> None:
+    """Emit ``package.priced`` (creation -> now) into each package's creation trace."""
+    if not settings.TRACING_ENABLED or not package_ids:
+        return
+    keys = [PACKAGE_TRACE_KEY.format(package_id) for package_id in package_ids]
+    values = await redis_client.mget(keys)
+    now_ns = time.time_ns()
+    worker_span = _current_span.get()
+    found = []
+    for package_id, key, value in zip(package_ids, keys, values):
+        if value is None:
+            continue
+        context = json.loads(value)
+        record_span(
+            "package.priced",
+            trace_id=context["trace_id"],
+            parent_id=context["span_id"],
+            start_ns=context["created_ns"],
+            duration_ms=(now_ns - context["created_ns"]) / 1e6,
+            package_id=str(package_id),
+            worker_trace_id=worker_span.trace_id if worker_span else None,
+        )
+        found.append(key)
+    if found:
+        await redis_client.delete(*found)
+
+
+def get_finished_spans() -> list[dict]:
+    """Spans kept by the memory exporter, oldest first."""
+    return list(_memory_spans)
+
+
+def clear_finished_spans() -> None:
+    _memory_spans.clear()
+
+
+def _export(span_data: dict) -> None:
+    if settings.TRACING_EXPORTER == "memory":
+        _memory_spans.append(span_data)
+        return
+    _get_span_logger().info(json.dumps(span_data, default=str, ensure_ascii=False))
+
+
+def _get_span_logger() -> logging.Logger:
+    """Dedicated logger writing raw span lines to TRACING_FILE via a queue thread."""
+    global _span_logger
+    if _span_logger is None:
+        file_handler = logging.FileHandler(settings.TRACING_FILE, encoding="utf-8")
+        file_handler.setFormatter(logging.Formatter("%(message)s"))
+        span_queue: queue.SimpleQueue = queue.SimpleQueue()
+        listener = QueueListener(span_queue, file_handler)
+        listener.start()
+
+        span_logger = logging.getLogger("delivery_service.tracing.spans")
+        span_logger.handlers = [QueueHandler(span_queue)]
+        span_logger.setLevel(logging.INFO)
+        span_logger.propagate = False
+        _span_logger = span_logger
+        atexit.register(listener.stop)
+    return _span_logger
+
+
+def _reset_span_logger_in_child() -> None:
+    # A forked child (celery prefork) inherits the logger but not the listener
+    # thread, so it builds its own on the first span.
+    global _span_logger
+    _span_logger = None
+
+
+os.register_at_fork(after_in_child=_reset_span_logger_in_child)
+
+
+def _report(path: str) -> None:
+    durations: dict[str, list[float]] = defaultdict(list)
+    with open(path, encoding="utf-8") as spans_file:
+        for line in spans_file:
+            item = json.loads(line)
+            durations[item["name"]].append(item["duration_ms"])
+
+    print(f"{'span':<40} {'count':>8} {'p50 ms':>10} {'p95 ms':>10} {'max ms':>10}")
+    for name, values in sorted(
+        durations.items(), key=lambda item: sum(item[1]), reverse=True
+    ):
+        values.sort()
+        p95 = values[max(int(len(values) * 0.95) - 1, 0)]
+        print(
+            f"{name:<40} {len(values):>8} {statistics.median(values):>10.1f} "
+            f"{p95:>10.1f} {values[-1]:>10.1f}"
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    commands = parser.add_subparsers(dest="command", required=True)
+    report = commands.add_parser("report", help="percentiles per span name")
+    report.add_argument("path", nargs="?", default=settings.TRACING_FILE)
+    args = parser.parse_args()
+    _report(args.path)
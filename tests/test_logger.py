@@ -0,0 +1,39 @@
+import logging
+
+from src.utils.logger import RateLimitFilter
+
+
+def make_record(name: str, lineno: int = 10) -> logging.LogRecord:
+    return logging.LogRecord(name, logging.INFO, "calc.py", lineno, "msg", None, None)
+
+
+def test_rate_limit_covers_child_loggers():
+    rate_limit = RateLimitFilter(5, name="delivery_service.worker")
+
+    passed = [
+        rate_limit.filter(make_record("delivery_service.worker.calc")) for _ in range(8)
+    ]
+
+    assert passed.count(True) == 5
+
+
+def test_rate_limit_ignores_other_loggers():
+    rate_limit = RateLimitFilter(5, name="delivery_service.worker")
+
+    for name in ("delivery_service.api", "delivery_service.workers"):
+        assert all(rate_limit.filter(make_record(name)) for _ in range(8))
+
+
+def test_suppressed_count_is_reported(monkeypatch):
+    now = [100.0]
+    monkeypatch.setattr("src.utils.logger.time.monotonic", lambda: now[0])
+    rate_limit = RateLimitFilter(1, name="delivery_service.worker")
+
+    assert rate_limit.filter(make_record("delivery_service.worker"))
+    assert not rate_limit.filter(make_record("delivery_service.worker"))
+    assert not rate_limit.filter(make_record("delivery_service.worker"))
+    now[0] += 1
+    record = make_record("delivery_service.worker")
+
+    assert rate_limit.filter(record)
+    assert record.suppressed == 2
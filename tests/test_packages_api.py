@@ -0,0 +1,174 @@
+import csv
+import io
+import json
+from decimal import Decimal
+
+import pytest
+
+from src.data.repositories.memory import DEFAULT_PACKAGE_TYPES
+
+ELECTRONICS_ID = str(DEFAULT_PACKAGE_TYPES[0][0])
+
+
+def create_package(client, **body):
+    payload = {"name": "Laptop", "weight_kg": "2.5", "contents_value": "100"}
+    payload.update(body)
+    return client.post("/api/packages", json=payload)
+
+
+def load_rates(redis_sync, rates):
+    redis_sync.hset("cbr_rates", mapping=rates)
+    redis_sync.hset("cbr_rates:last_known", mapping=rates)
+
+
+def test_package_types_are_seeded(client):
+    response = client.get("/api/package-types")
+
+    assert response.status_code == 200
+    ids = {item["id"] for item in response.json()["package_types"]}
+    assert {str(type_id) for type_id, _, _ in DEFAULT_PACKAGE_TYPES} <= ids
+
+
+def test_create_and_get_keeps_contents_value_usd(client):
+    created = create_package(client, type_id=ELECTRONICS_ID)
+
+    assert created.status_code == 200
+    body = created.json()
+    assert Decimal(body["contents_value_usd"]) == Decimal(body["contents_value"]) == 100
+    assert body["contents_currency"] == "USD"
+
+    response = client.get(f"/api/{body['id']}")
+
+    assert response.status_code == 200
+    package = response.json()
+    assert Decimal(package["contents_value_usd"]) == 100
+    assert Decimal(package["contents_value"]) == 100
+    assert package["contents_currency"] == "USD"
+    assert package["package_type"]["id"] == ELECTRONICS_ID
+
+
+def test_legacy_input_field_is_accepted(client):
+    response = client.post(
+        "/api/packages",
+        json={"name": "Book", "weight_kg": "1", "contents_value_usd": "15"},
+    )
+
+    assert response.status_code == 200
+    assert Decimal(response.json()["contents_value"]) == 15
+
+
+def test_get_with_fields(client):
+    package_id = create_package(client).json()["id"]
+
+    response = client.get(
+        f"/api/{package_id}", params={"fields": "id,contents_value_usd"}
+    )
+
+    assert response.status_code == 200
+    body = response.json()
+    assert body.keys() == {"id", "contents_value_usd"}
+    assert Decimal(body["contents_value_usd"]) == 100
+
+
+def test_list_with_fields(client):
+    create_package(client, name="A")
+    create_package(client, name="B", contents_value="20")
+
+    response = client.get(
+        "/api/packages",
+        params={
+            "fields": "name,contents_value_usd,contents_value,contents_currency",
+            "page_size": 10,
+        },
+    )
+
+    assert response.status_code == 200
+    items = sorted(response.json()["packages"], key=lambda item: item["name"])
+    assert [Decimal(item["contents_value_usd"]) for item in items] == [100, 20]
+    assert items[0].keys() == {
+        "name",
+        "contents_value_usd",
+        "contents_value",
+        "contents_currency",
+    }
+
+
+def test_unknown_field_is_rejected(client):
+    response = client.get("/api/packages", params={"fields": "id,secret"})
+
+    assert response.status_code == 400
+
+
+def test_export_csv_keeps_contents_value_usd(client):
+    create_package(client)
+
+    response = client.get(
+        "/api/packages/export",
+        params={
+            "format": "csv",
+            "fields": "name,contents_value_usd,contents_value,contents_currency",
+        },
+    )
+
+    assert response.status_code == 200
+    (row,) = csv.DictReader(io.StringIO(response.text))
+    assert row.keys() == {
+        "name",
+        "contents_value_usd",
+        "contents_value",
+        "contents_currency",
+    }
+    assert Decimal(row["contents_value_usd"]) == Decimal(row["contents_value"]) == 100
+    assert row["contents_currency"] == "USD"
+
+
+def test_export_ndjson_default_fields(client):
+    create_package(client)
+
+    response = client.get("/api/packages/export")
+
+    assert response.status_code == 200
+    (line,) = response.text.splitlines()
+    row = json.loads(line)
+    assert row["contents_value_usd"] == row["contents_value"]
+    assert row["contents_currency"] == "USD"
+
+
+def test_non_usd_package_needs_rates(client):
+    response = create_package(client, contents_currency="EUR")
+
+    assert response.status_code == 503
+    assert response.headers["Retry-After"] == "5"
+
+
+@pytest.mark.parametrize(
+    ("currency", "value", "status"),
+    [("EUR", "100", 200), ("EUR", "1000000", 422), ("XXX", "100", 400)],
+)
+def test_non_usd_package_is_checked_against_cached_rates(
+    client, redis_sync, currency, value, status
+):
+    load_rates(redis_sync, {"RUB": 1.0, "USD": 90.0, "EUR": 99.0})
+
+    response = create_package(client, contents_value=value, contents_currency=currency)
+
+    assert response.status_code == status
+
+
+def test_expired_rates_fall_back_to_last_known(client, redis_sync):
+    redis_sync.hset("cbr_rates:last_known", mapping={"USD": 90.0, "EUR": 99.0})
+
+    response = create_package(client, contents_value="1000000", contents_currency="EUR")
+
+    assert response.status_code == 422
+
+
+def test_session_key_is_written_once(client, redis_sync, session_id):
+    create_package(client)
+    key = f"session:{session_id}"
+    ttl = redis_sync.ttl(key)
+    redis_sync.expire(key, ttl - 100)
+
+    client.get("/api/packages", params={"page_size": 10})
+
+    assert 0 < redis_sync.ttl(key) <= ttl - 100
@@ -0,0 +1,105 @@
+from decimal import Decimal
+
+import fakeredis
+import pytest
+
+import src.tasks.refresh_rates
+from src.tasks.refresh_rates import refresh_currency_rates
+from src.utils.currency_utils import CurrencyService
+
+QUOTE = {
+    "items": [
+        {"weight_kg": "2", "contents_value": "10"},
+        {"weight_kg": "2", "contents_value": "100", "contents_currency": "EUR"},
+    ]
+}
+
+
+@pytest.fixture
+def refresh(monkeypatch, redis_server, cbr):
+    """Run the beat task against the test Redis."""
+
+    async def get_redis_client():
+        return fakeredis.FakeAsyncRedis(server=redis_server, decode_responses=True)
+
+    monkeypatch.setattr(src.tasks.refresh_rates, "get_redis_client", get_redis_client)
+    return refresh_currency_rates
+
+
+def expire_rates(redis_sync):
+    """What ``cache_ttl`` and ``local_ttl`` running out look like to readers."""
+    redis_sync.delete("cbr_rates")
+    CurrencyService._local_expires_at = 0.0
+
+
+def test_quote_without_any_rates_is_unavailable(client, cbr):
+    response = client.post("/api/quote", json=QUOTE)
+
+    assert response.status_code == 503
+    assert response.headers["Retry-After"] == "5"
+    # Quotes never wait for cbr-xml-daily.
+    assert cbr.fetches == 0
+
+
+def test_quote_uses_refreshed_rates(client, refresh):
+    assert refresh() == {"refreshed": True, "currencies": 3}
+
+    response = client.post("/api/quote", json=QUOTE)
+
+    assert response.status_code == 200
+    usd, eur = response.json()["items"]
+    assert Decimal(usd["delivery_cost_rub"]) == Decimal("99.00")
+    assert Decimal(usd["contents_value_usd"]) == Decimal(usd["contents_value"]) == 10
+    assert Decimal(eur["delivery_cost_rub"]) == Decimal("189.00")
+    assert eur["contents_currency"] == "EUR"
+    assert eur["error"] is None
+
+
+def test_refresh_sets_cache_ttl_and_keeps_last_known(refresh, redis_sync):
+    refresh()
+
+    assert 0 < redis_sync.ttl("cbr_rates") <= 300
+    assert redis_sync.ttl("cbr_rates:last_known") == -1
+
+
+def test_quote_after_cache_ttl_uses_last_known_rates(client, refresh, redis_sync, cbr):
+    refresh()
+    expire_rates(redis_sync)
+    cbr.rates = None
+
+    assert refresh() == {"refreshed": False}
+    response = client.post("/api/quote", json=QUOTE)
+
+    assert response.status_code == 200
+    assert [item["error"] for item in response.json()["items"]] == [None, None]
+
+
+def test_quote_picks_up_a_new_table(client, refresh, redis_sync, cbr):
+    refresh()
+    client.post("/api/quote", json=QUOTE)
+    cbr.rates = {"RUB": 1.0, "USD": 100.0, "EUR": 110.0}
+
+    refresh()
+    expire_rates(redis_sync)
+    response = client.post("/api/quote", json=QUOTE)
+
+    usd, _ = response.json()["items"]
+    assert Decimal(usd["delivery_cost_rub"]) == Decimal("110.00")
+
+
+def test_quote_rejects_unknown_currency_per_item(client, refresh):
+    refresh()
+
+    response = client.post(
+        "/api/quote",
+        json={
+            "items": [
+                {"weight_kg": "1", "contents_value": "5", "contents_currency": "XXX"}
+            ]
+        },
+    )
+
+    assert response.status_code == 200
+    (item,) = response.json()["items"]
+    assert item["delivery_cost_rub"] is None
+    assert item["error"] == "Currency XXX is not supported"